@@ -12,6 +12,7 @@ import hashlib
 import json
 import random
 import time
+import zlib
 from typing import Any, Dict, List, Optional
 from dataclasses import dataclass, asdict
 from medical.circuit_mapper import MedicalDataCircuitMapper
@@ -21,6 +22,12 @@ from medical.circuit_mapper import MedicalDataCircuitMapper
 @dataclass
 class ZKProof:
     """Zero-knowledge proof structure for redaction operations."""
+    # Manual slots (not slots=True) to keep Python 3.9 support
+    __slots__ = (
+        "proof_id", "operation_type", "commitment", "nullifier",
+        "merkle_root", "timestamp", "verifier_challenge", "prover_response",
+    )
+    
     proof_id: str
     operation_type: str  # "DELETE", "MODIFY", "ANONYMIZE"
     commitment: str  # Commitment to the redacted data
@@ -56,12 +63,16 @@ class RedactionSNARKManager:
     def __init__(self, snark_client: Optional[Any] = None):
         if snark_client is None:
             from adapters.snark import SnarkClient
+            # The constructor already raises when artifacts are missing
             snark_client = SnarkClient()
-        if not hasattr(snark_client, "is_available") or not snark_client.is_available():
+        elif not hasattr(snark_client, "is_available") or not snark_client.is_available():
             raise ValueError("SnarkClient must expose circuit artifacts to generate proofs")
         
         self.snark_client = snark_client
         self.circuit_mapper = MedicalDataCircuitMapper()
+        # Keep the proving key hot before the first proof is requested
+        if hasattr(snark_client, "warmup"):
+            snark_client.warmup()
         self.commitment_store: Dict[str, RedactionCommitment] = {}
     
     def _extract_medical_record_dict(self, redaction_request: Dict[str, Any]) -> Dict[str, Any]:
@@ -118,16 +129,19 @@ class RedactionSNARKManager:
             if not pub_signals:
                 raise ValueError("Missing public signals from snarkjs result")
             
-            proof_id = f"real_{int(time.time())}_{hash(str(pub_signals)) % 1_000_000}"
+            # One clock read keeps the id, nullifier and timestamp consistent
+            now = time.time_ns() // 1_000_000_000
+            signals_json = json.dumps(pub_signals)
+            proof_id = f"real_{now}_{zlib.crc32(signals_json.encode()) % 1_000_000}"
             proof = ZKProof(
                 proof_id=proof_id,
                 operation_type=redaction_type,
                 commitment=str(pub_signals[0]),
-                nullifier=f"nullifier_{int(time.time())}",
-                merkle_root=str(circuit_inputs.public_inputs.get("merkleRoot0", 0)),
-                timestamp=int(time.time()),
+                nullifier=f"nullifier_{now}",
+                merkle_root=circuit_inputs.merkle_root_0,
+                timestamp=now,
                 verifier_challenge=json.dumps(result.get("proof", {})),
-                prover_response=json.dumps(pub_signals)
+                prover_response=signals_json
             )
             
             original_serialized = self.circuit_mapper.serialize_medical_data(medical_record)
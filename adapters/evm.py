@@ -7,9 +7,13 @@ Safe to import without web3 installed; imports are deferred.
 """
 from __future__ import annotations
 
+from collections import OrderedDict
 from typing import Any, Optional, Dict
 from .config import env_bool, env_str
-import json, os, time
+import hashlib, json, os, time
+
+# Upper bound on cached calldata blobs kept per client
+_CALLDATA_CACHE_SIZE = 256
 
 try:  # optional dependency
     from web3 import Web3  # type: ignore
@@ -37,6 +41,8 @@ class EVMClient:
         self._w3 = None
         self._acct = None
         self._artifacts_dir = env_str("CONTRACT_ARTIFACTS_DIR", "contracts/artifacts")
+        # ABI-encoded calldata keyed by (contract address, function, proof key)
+        self._calldata_cache: "OrderedDict[tuple, str]" = OrderedDict()
 
     def is_enabled(self) -> bool:
         return env_bool("USE_REAL_EVM", False)
@@ -66,26 +72,35 @@ class EVMClient:
             return True
         return self.connect()
 
+    def _tx_params(self) -> Dict[str, Any]:
+        sender = self._acct.address if self._acct else self._w3.eth.accounts[0]
+        return {
+            "from": sender,
+            "nonce": self._w3.eth.get_transaction_count(sender),
+            "chainId": int(env_str("EVM_CHAIN_ID", "31337")),
+            # Fixed gas limit; fee fields come from build_transaction or _send_calldata
+            "gas": 3_000_000,
+        }
+
+    def _sign_and_send(self, tx: Dict[str, Any], *, return_receipt: bool = False):
+        if self._acct is not None:
+            signed = self._w3.eth.account.sign_transaction(tx, self._acct.key)
+            # eth-account>=0.13 renamed rawTransaction to raw_transaction
+            raw = getattr(signed, "raw_transaction", None) or signed.rawTransaction
+            tx_hash = self._w3.eth.send_raw_transaction(raw)
+        else:
+            tx_hash = self._w3.eth.send_transaction(tx)
+        receipt = self._w3.eth.wait_for_transaction_receipt(tx_hash)
+        if return_receipt:
+            return receipt
+        return receipt.transactionHash.hex()
+
     def _build_and_send(self, fn, *, return_receipt: bool = False):
         if not self._connected or self._w3 is None:
             return None
         try:
-            tx = fn.build_transaction({
-                "from": (self._acct.address if self._acct else self._w3.eth.accounts[0]),
-                "nonce": self._w3.eth.get_transaction_count(self._acct.address if self._acct else self._w3.eth.accounts[0]),
-                "chainId": int(env_str("EVM_CHAIN_ID", "31337")),
-                # gas and gasPrice can be estimated; keep simple defaults
-                "gas": 3_000_000,
-            })
-            if self._acct is not None:
-                signed = self._w3.eth.account.sign_transaction(tx, self._acct.key)
-                tx_hash = self._w3.eth.send_raw_transaction(signed.rawTransaction)
-            else:
-                tx_hash = self._w3.eth.send_transaction(tx)
-            receipt = self._w3.eth.wait_for_transaction_receipt(tx_hash)
-            if return_receipt:
-                return receipt
-            return receipt.transactionHash.hex()
+            tx = fn.build_transaction(self._tx_params())
+            return self._sign_and_send(tx, return_receipt=return_receipt)
         except Exception:
             return None
 
@@ -184,6 +199,68 @@ class EVMClient:
         )
         return self._build_and_send(fn)
 
+    def _calldata_for(self, contract, fn_name: str, args: list) -> str:
+        """Return ABI-encoded calldata for ``fn_name``, encoding each argument list once.
+
+        Encoding the Groth16 arrays is the expensive part of building these
+        transactions, so resubmitting identical arguments reuses the cached bytes.
+        The key digests every argument, so a corrected proof or changed state
+        hash is always encoded afresh.
+        """
+        args_digest = hashlib.blake2b(repr(args).encode(), digest_size=16).digest()
+        key = (getattr(contract, "address", None), fn_name, args_digest)
+        data = self._calldata_cache.get(key)
+        if data is not None:
+            self._calldata_cache.move_to_end(key)
+            return data
+        if hasattr(contract, "encode_abi"):  # web3>=7
+            data = contract.encode_abi(fn_name, args=args)
+        else:
+            data = contract.encodeABI(fn_name=fn_name, args=args)
+        self._calldata_cache[key] = data
+        if len(self._calldata_cache) > _CALLDATA_CACHE_SIZE:
+            self._calldata_cache.popitem(last=False)
+        return data
+
+    def _send_calldata(self, to: str, data: str):
+        if not self._connected or self._w3 is None:
+            return None
+        try:
+            tx = self._tx_params()
+            tx.update({"to": to, "data": data})
+            # No build_transaction here, so fill in the fee a local signer requires
+            tx["gasPrice"] = self._w3.eth.gas_price
+            return self._sign_and_send(tx)
+        except Exception:
+            return None
+
+    def requestDataRedactionWithFullProofs(
+        self,
+        contract,
+        patient_id: str,
+        redaction_type: str,
+        reason: str,
+        pA: list[int],
+        pB: list[list[int]],
+        pC: list[int],
+        pubSignals: list[int],
+        nullifier: bytes,
+        consistency_proof_hash: bytes,
+        pre_state_hash: bytes,
+        post_state_hash: bytes,
+    ) -> Optional[str]:
+        if not self._connected:
+            return None
+        args = [
+            patient_id, redaction_type, reason, pA, pB, pC, pubSignals,
+            nullifier, consistency_proof_hash, pre_state_hash, post_state_hash,
+        ]
+        try:
+            data = self._calldata_for(contract, "requestDataRedactionWithFullProofs", args)
+        except Exception:
+            return None
+        return self._send_calldata(contract.address, data)
+
     def requestDataRedactionFromSnarkjs(
         self,
         contract,
@@ -313,12 +390,7 @@ class EVMClient:
             "chainId": int(env_str("EVM_CHAIN_ID", "31337")),
             "gas": 6_000_000,
         })
-        if self._acct is not None:
-            signed = self._w3.eth.account.sign_transaction(tx, self._acct.key)
-            tx_hash = self._w3.eth.send_raw_transaction(signed.rawTransaction)
-        else:
-            tx_hash = self._w3.eth.send_transaction(tx)
-        receipt = self._w3.eth.wait_for_transaction_receipt(tx_hash)
+        receipt = self._sign_and_send(tx, return_receipt=True)
         address = receipt.contractAddress
         contract = self._w3.eth.contract(address=address, abi=abi)
         return address, contract
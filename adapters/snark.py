@@ -11,6 +11,8 @@ import json
 import os
 import subprocess
 import tempfile
+import threading
+import uuid
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -28,6 +30,10 @@ class SnarkClient:
         self.wasm_path = self.build_dir / "redaction_js" / "redaction.wasm"
         self.zkey_path = self.build_dir / "redaction_final.zkey"
         self.vkey_path = self.build_dir / "verification_key.json"
+        # Proves write per-call files; this only guards publishing the latest
+        # pair to proof.json/public.json
+        self._publish_lock = threading.Lock()
+        self._warmed = False
         if not self.is_available():
             raise FileNotFoundError(
                 "Required SNARK artifacts not found. Ensure redaction.wasm, redaction_final.zkey, "
@@ -46,6 +52,27 @@ class SnarkClient:
             self.vkey_path.exists()
         )
     
+    def warmup(self) -> None:
+        """Prefetch the proving and verification artifacts into the OS page cache.
+        
+        Every snarkjs invocation re-reads the zkey, witness wasm and
+        verification key from disk; prefetching them once lets those reads be
+        served from memory.
+        """
+        if self._warmed:
+            return
+        for path in (self.zkey_path, self.wasm_path, self.vkey_path):
+            try:
+                with open(path, "rb") as f:
+                    if hasattr(os, "posix_fadvise"):
+                        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+                    else:
+                        while f.read(1 << 20):
+                            pass
+            except OSError:
+                continue
+        self._warmed = True
+    
     def _run_snarkjs(self, args: List[str], cwd: Optional[Path] = None) -> subprocess.CompletedProcess:
         """Run snarkjs command with given arguments."""
         cmd = ["snarkjs"] + args
@@ -71,14 +98,15 @@ class SnarkClient:
         # Combine all inputs
         inputs = {**public_inputs, **private_inputs}
         
-        # Create temporary input file
+        # Create temporary input file (compact json.dumps stays on the C encoder)
         with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json.dump(inputs, f, indent=2)
+            f.write(json.dumps(inputs))
             input_path = Path(f.name)
         
         try:
-            # Generate witness
-            witness_path = self.build_dir / "witness.wtns"
+            # Generate witness (unique per call so witnesses can be computed
+            # while another request is being proved)
+            witness_path = self.build_dir / f"witness_{uuid.uuid4().hex}.wtns"
             self._run_snarkjs([
                 "wtns", "calculate",
                 str(self.wasm_path),
@@ -92,13 +120,21 @@ class SnarkClient:
             # Clean up temp file
             input_path.unlink(missing_ok=True)
     
-    def prove(self, witness_path: Path) -> Optional[Tuple[Dict[str, Any], List[str]]]:
-        """Generate Groth16 proof from witness."""
+    def prove(self, witness_path: Path, raw: bool = False) -> Optional[Tuple[Any, ...]]:
+        """Generate Groth16 proof from witness.
+        
+        Returns (proof, public_signals), or with raw=True also the proof.json
+        and public.json text exactly as snarkjs wrote it.
+        """
         if not witness_path.exists():
             raise RuntimeError("Witness file not found for Groth16 proof generation")
             
         proof_path = self.build_dir / "proof.json"
         public_path = self.build_dir / "public.json"
+        # Unique outputs per call so several proves can run at once
+        tag = uuid.uuid4().hex
+        call_proof_path = self.build_dir / f"proof_{tag}.json"
+        call_public_path = self.build_dir / f"public_{tag}.json"
         
         try:
             # Generate proof
@@ -106,23 +142,39 @@ class SnarkClient:
                 "groth16", "prove",
                 str(self.zkey_path),
                 str(witness_path),
-                str(proof_path),
-                str(public_path)
+                str(call_proof_path),
+                str(call_public_path)
             ])
             
-            if not (proof_path.exists() and public_path.exists()):
+            if not (call_proof_path.exists() and call_public_path.exists()):
                 return None
-                
+            
             # Load results
-            with open(proof_path, 'r') as f:
-                proof = json.load(f)
-            with open(public_path, 'r') as f:
-                public_signals = json.load(f)
-                
-            return proof, public_signals
+            with open(call_proof_path, 'r') as f:
+                proof_raw = f.read()
+            with open(call_public_path, 'r') as f:
+                public_raw = f.read()
+            proof = json.loads(proof_raw)
+            public_signals = json.loads(public_raw)
             
+            # Keep proof.json/public.json as the latest matching pair for
+            # readers such as EVMClient.requestDataRedactionFromSnarkjs
+            try:
+                with self._publish_lock:
+                    os.replace(call_proof_path, proof_path)
+                    os.replace(call_public_path, public_path)
+            except OSError:
+                pass
+            
+            if raw:
+                return proof, public_signals, proof_raw, public_raw
+            return proof, public_signals
+        
         except Exception:
             return None
+        finally:
+            call_proof_path.unlink(missing_ok=True)
+            call_public_path.unlink(missing_ok=True)
     
     def verify_proof(self, proof: Dict[str, Any], public_signals: List[str]) -> bool:
         """Verify proof using snarkjs groth16 verify."""
@@ -200,11 +252,11 @@ class SnarkClient:
             
         try:
             # Generate proof
-            proof_result = self.prove(witness_path)
+            proof_result = self.prove(witness_path, raw=True)
             if not proof_result:
                 return None
                 
-            proof, public_signals = proof_result
+            proof, public_signals, *raw = proof_result
             
             # Verify proof off-chain
             if not self.verify_proof(proof, public_signals):
@@ -217,7 +269,7 @@ class SnarkClient:
                 
             pA, pB, pC, pubSignals = calldata
             
-            return {
+            result = {
                 "proof": proof,
                 "public_signals": public_signals,
                 "calldata": {
@@ -228,6 +280,10 @@ class SnarkClient:
                 },
                 "verified": True
             }
+            if raw:
+                # Unparsed snarkjs output, for callers that store the JSON as-is
+                result["proof_raw"], result["public_signals_raw"] = raw
+            return result
             
         finally:
             # Clean up witness file
@@ -11,9 +11,12 @@ for the "Data Redaction in Smart-Contract-Enabled Permissioned Blockchains" impl
 import json
 import time
 import hashlib
+import zlib
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 import copy
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from ZK.SNARKs import ZKProof
 from ZK.ProofOfConsistency import ConsistencyProofGenerator, ConsistencyCheckType, ConsistencyProof
@@ -64,6 +67,8 @@ try:
 except Exception:  # pragma: no cover - optional import
     EVMClient = None  # type: ignore
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class RedactionRequest:
@@ -98,6 +103,15 @@ class MedicalDataRecord:
     ipfs_hash: Optional[str] = None
     
 
+@dataclass(frozen=True)
+class PreparedProofInputs:
+    """Validated circuit inputs for one redaction payload, ready to prove."""
+    redaction_type: str
+    circuit_inputs: Any
+    timestamp: int
+    policy_hash: str
+
+
 class HybridSNARKManager:
     """SNARK manager that always uses the real snarkjs adapter."""
 
@@ -108,11 +122,19 @@ class HybridSNARKManager:
             raise ValueError("SnarkClient is not ready: circuit artifacts missing")
         self.snark_client = snark_client
         self.circuit_mapper = MedicalDataCircuitMapper()
+        # Keep the proving key hot before the first proof is requested
+        if hasattr(snark_client, "warmup"):
+            snark_client.warmup()
         self._last_snark_payload: Optional[Dict[str, Any]] = None
 
     def _extract_medical_record_dict(self, redaction_data: Dict[str, Any]) -> Dict[str, Any]:
         """Convert redaction payload into a canonical medical record dictionary."""
         original_data = redaction_data.get("original_data", "{}")
+        # In-process callers may hand over the record dict directly
+        if isinstance(original_data, dict):
+            if "patient_id" in original_data:
+                return original_data
+            return {**original_data, "patient_id": redaction_data.get("request_id", "unknown")}
         try:
             record_dict = json.loads(original_data)
             if isinstance(record_dict, dict) and "patient_id" in record_dict:
@@ -147,127 +169,168 @@ class HybridSNARKManager:
         """Expose the last generated SNARK payload (proof + calldata)."""
         return self._last_snark_payload
 
-    def create_redaction_proof(self, redaction_data: Dict[str, Any]) -> Optional[ZKProof]:
-        """Create a redaction proof using real snarkjs."""
-        try:
-            medical_record_dict = self._extract_medical_record_dict(redaction_data)
-            redaction_type = redaction_data.get("redaction_type", "MODIFY")
-            policy_hash = redaction_data.get("policy_hash", f"policy_{redaction_type}")
-
-            circuit_inputs = self.circuit_mapper.prepare_circuit_inputs(
-                medical_record_dict,
-                redaction_type,
-                policy_hash,
-            )
-            if not self.circuit_mapper.validate_circuit_inputs(circuit_inputs):
-                raise ValueError("Invalid circuit inputs for SNARK proof generation")
-
-            result = self.snark_client.prove_redaction(
-                circuit_inputs.public_inputs,
-                circuit_inputs.private_inputs,
-            )
-            if not result or not result.get("verified"):
-                raise ValueError("snarkjs failed to generate or verify the proof")
-
-            calldata = result.get("calldata", {})
-            pub_signals = calldata.get("pubSignals", [])
-            if not pub_signals:
-                raise ValueError("Missing public signals from SNARK proof result")
-
-            nullifier_bytes = hashlib.sha256(
-                json.dumps(pub_signals, sort_keys=True).encode()
-            ).digest()
-            proof = ZKProof(
-                proof_id=f"real_{int(time.time())}_{hash(str(pub_signals)) % 1_000_000}",
-                operation_type=redaction_type,
-                commitment=str(pub_signals[0]),
-                nullifier="0x" + nullifier_bytes.hex(),
-                merkle_root=str(circuit_inputs.public_inputs.get("merkleRoot0", 0)),
-                timestamp=int(time.time()),
-                verifier_challenge=json.dumps(result.get("proof", {})),
-                prover_response=json.dumps(pub_signals),
-            )
-            self._record_snark_payload(result, circuit_inputs, nullifier_bytes, False)
-            return proof
-        except Exception as exc:
-            print(f"Real SNARK proof generation failed: {exc}")
-            return None
-
-    def create_redaction_proof_with_consistency(
+    def _prepare_proof_inputs(
         self,
         redaction_data: Dict[str, Any],
-        consistency_proof=None,  # Optional ConsistencyProof
-    ) -> Optional[ZKProof]:
-        """
-        Create a redaction proof WITH consistency verification integrated.
-        """
-        try:
-            print(" Generating real SNARK proof WITH consistency verification...")
-
-            # Extract medical record
-            medical_record_dict = self._extract_medical_record_dict(redaction_data)
-
-            # Get redaction type and policy
-            redaction_type = redaction_data.get("redaction_type", "MODIFY")
-            policy_hash = redaction_data.get("policy_hash", f"policy_{redaction_type}")
+        consistency_proof=None,
+        with_consistency: bool = False,
+    ) -> PreparedProofInputs:
+        """Map a redaction payload to validated circuit inputs."""
+        medical_record_dict = self._extract_medical_record_dict(redaction_data)
+        ts = time.time_ns() // 1_000_000_000
+        redaction_type = redaction_data.get("redaction_type", "MODIFY")
+        policy_hash = redaction_data.get("policy_hash", f"policy_{redaction_type}")
 
-            # Use circuit mapper to prepare inputs WITH consistency proof
+        if with_consistency:
             circuit_inputs = self.circuit_mapper.prepare_circuit_inputs_with_consistency(
                 medical_record_dict,
                 redaction_type,
                 policy_hash,
                 consistency_proof,
             )
-
-            # Validate inputs with consistency
             if not self.circuit_mapper.validate_circuit_inputs_with_consistency(circuit_inputs):
-                print("  Circuit input validation failed (with consistency)")
                 raise ValueError("Invalid circuit inputs with consistency")
-
-            print("   Circuit inputs prepared and validated (with consistency)")
-
-            # Generate real SNARK proof using snarkjs
-            result = self.snark_client.prove_redaction(
-                circuit_inputs.public_inputs,
-                circuit_inputs.private_inputs,
+        else:
+            circuit_inputs = self.circuit_mapper.prepare_circuit_inputs(
+                medical_record_dict,
+                redaction_type,
+                policy_hash,
             )
+            if not self.circuit_mapper.validate_circuit_inputs(circuit_inputs):
+                raise ValueError("Invalid circuit inputs for SNARK proof generation")
+        return PreparedProofInputs(redaction_type, circuit_inputs, ts, policy_hash)
 
-            if not result or not result.get("verified"):
-                print("  Real SNARK proof verification failed")
-                raise ValueError("Proof verification failed")
+    def _finalize_proof(
+        self,
+        result: Optional[Dict[str, Any]],
+        prepared: PreparedProofInputs,
+        with_consistency: bool = False,
+    ) -> ZKProof:
+        """Wrap a snarkjs proving result into a ZKProof."""
+        circuit_inputs = prepared.circuit_inputs
+        ts = prepared.timestamp
+        if not result or not result.get("verified"):
+            raise ValueError("snarkjs failed to generate or verify the proof")
 
-            # Extract calldata
-            calldata = result.get("calldata", {})
-            pub_signals = calldata.get("pubSignals", [])
-            if not pub_signals:
-                raise ValueError("Missing public signals from proof result")
+        calldata = result.get("calldata", {})
+        pub_signals = calldata.get("pubSignals", [])
+        if not pub_signals:
+            raise ValueError("Missing public signals from SNARK proof result")
 
+        # Encoded once for the nullifier, the proof id and the stored signals
+        signals_json = json.dumps(pub_signals)
+        signals_bytes = signals_json.encode()
+        if with_consistency:
             nullifier_bytes = hashlib.sha256(
                 json.dumps(
                     {
                         "pubSignals": pub_signals,
-                        "policy": policy_hash,
-                        "timestamp": int(time.time()),
+                        "policy": prepared.policy_hash,
+                        "timestamp": ts,
                     },
                     sort_keys=True,
                 ).encode()
             ).digest()
+            proof_id = f"real_groth16_{ts}_{zlib.crc32(signals_bytes) % 10000}"
+        else:
+            nullifier_bytes = hashlib.sha256(signals_bytes).digest()
+            proof_id = f"real_{ts}_{zlib.crc32(signals_bytes) % 1_000_000}"
 
-            proof = ZKProof(
-                proof_id=f"real_groth16_{int(time.time())}_{hash(str(pub_signals)) % 10000}",
-                operation_type=redaction_type,
-                commitment=str(pub_signals[0]),
-                nullifier="0x" + nullifier_bytes.hex(),
-                merkle_root=str(circuit_inputs.public_inputs.get("merkleRoot0", 0)),
-                timestamp=int(time.time()),
-                verifier_challenge=json.dumps(result.get("proof", {})),
-                prover_response=json.dumps(pub_signals),
-            )
-            self._record_snark_payload(result, circuit_inputs, nullifier_bytes, True)
-            return proof
+        proof = ZKProof(
+            proof_id=proof_id,
+            operation_type=prepared.redaction_type,
+            commitment=str(pub_signals[0]),
+            nullifier="0x" + nullifier_bytes.hex(),
+            merkle_root=circuit_inputs.merkle_root_0,
+            timestamp=ts,
+            verifier_challenge=json.dumps(result.get("proof", {})),
+            prover_response=signals_json,
+        )
+        self._record_snark_payload(result, circuit_inputs, nullifier_bytes, with_consistency)
+        return proof
 
-        except Exception as e:
-            print(f"  Real SNARK proof generation failed: {e}")
+    def _run_proof(
+        self,
+        redaction_data: Dict[str, Any],
+        consistency_proof=None,
+        with_consistency: bool = False,
+    ) -> ZKProof:
+        """Prepare inputs, prove with snarkjs and build the ZKProof."""
+        prepared = self._prepare_proof_inputs(redaction_data, consistency_proof, with_consistency)
+        result = self.snark_client.prove_redaction(
+            prepared.circuit_inputs.public_inputs,
+            prepared.circuit_inputs.private_inputs,
+        )
+        return self._finalize_proof(result, prepared, with_consistency=with_consistency)
+
+    def create_redaction_proof(self, redaction_data: Dict[str, Any]) -> Optional[ZKProof]:
+        """Create a redaction proof using real snarkjs."""
+        try:
+            return self._run_proof(redaction_data)
+        except Exception:
+            logger.exception("Real SNARK proof generation failed")
+            return None
+
+    def create_redaction_proofs_batch(self, items: List[Dict[str, Any]]) -> List[Optional[ZKProof]]:
+        """Create proofs for several redaction payloads, proving them concurrently.
+
+        Circuit inputs are prepared sequentially; the snarkjs calls run on a
+        thread pool since the heavy work happens in snarkjs child processes.
+        Proofs are finalized in input order, so the last snark payload belongs
+        to the last successful item. Failed items yield None.
+        """
+        prepared: List[Optional[PreparedProofInputs]] = []
+        for redaction_data in items:
+            try:
+                prepared.append(self._prepare_proof_inputs(redaction_data))
+            except Exception:
+                logger.exception("Real SNARK proof generation failed")
+                prepared.append(None)
+
+        jobs = [i for i, entry in enumerate(prepared) if entry is not None]
+        results: Dict[int, Optional[Dict[str, Any]]] = {}
+        if jobs:
+            with ThreadPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as executor:
+                futures = {
+                    executor.submit(
+                        self.snark_client.prove_redaction,
+                        prepared[i].circuit_inputs.public_inputs,
+                        prepared[i].circuit_inputs.private_inputs,
+                    ): i
+                    for i in jobs
+                }
+                for future in as_completed(futures):
+                    try:
+                        results[futures[future]] = future.result()
+                    except Exception:
+                        logger.exception("Real SNARK proof generation failed")
+                        results[futures[future]] = None
+
+        proofs: List[Optional[ZKProof]] = []
+        for i, entry in enumerate(prepared):
+            if entry is None:
+                proofs.append(None)
+                continue
+            try:
+                proofs.append(self._finalize_proof(results.get(i), entry))
+            except Exception:
+                logger.exception("Real SNARK proof generation failed")
+                proofs.append(None)
+        return proofs
+
+    def create_redaction_proof_with_consistency(
+        self,
+        redaction_data: Dict[str, Any],
+        consistency_proof=None,  # Optional ConsistencyProof
+    ) -> Optional[ZKProof]:
+        """
+        Create a redaction proof WITH consistency verification integrated.
+        """
+        try:
+            logger.info("Generating real SNARK proof with consistency verification")
+            return self._run_proof(redaction_data, consistency_proof, with_consistency=True)
+        except Exception:
+            logger.exception("Real SNARK proof generation failed (with consistency)")
             return None
 
     def verify_redaction_proof(self, proof: ZKProof, public_inputs: Dict[str, Any]) -> bool:
@@ -277,7 +340,7 @@ class HybridSNARKManager:
             public_signals = json.loads(proof.prover_response)
             return self.snark_client.verify_proof(proof_payload, public_signals)
         except Exception as exc:
-            print(f"Failed to verify SNARK proof {proof.proof_id}: {exc}")
+            logger.warning("Failed to verify SNARK proof %s: %s", proof.proof_id, exc)
             return False
 
 
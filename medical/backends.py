@@ -7,9 +7,20 @@ against either the simulated in-memory contract or an EVM-backed adapter.
 """
 from __future__ import annotations
 
+import hashlib
 from typing import Optional, Any, Dict
 
 
+def _fallback_nullifier(patient_id: str, pub_signals: list) -> bytes:
+    """Derive a 32-byte nullifier when the circuit does not expose one.
+
+    Public signals are packed as fixed-width big-endian words rather than
+    stringified, so large signal lists hash without a repr per element.
+    """
+    packed = b"".join(int(x).to_bytes(32, "big") for x in pub_signals)
+    return hashlib.sha256(patient_id.encode() + packed).digest()
+
+
 class RedactionBackend:
     """Abstract backend for redaction flows."""
 
@@ -144,7 +155,6 @@ class EVMBackend(RedactionBackend):
         try:
             # Extract nullifier from public signals
             pub_signals = snark_proof_payload.get("pubSignals", [])
-            nullifier_bytes = b"\x00" * 32
             
             if len(pub_signals) >= 10:
                 # Public signal indices 8 and 9 contain nullifier0 and nullifier1
@@ -152,6 +162,11 @@ class EVMBackend(RedactionBackend):
                 null_limb1 = int(pub_signals[9])
                 nullifier_int = null_limb0 + (null_limb1 << 128)
                 nullifier_bytes = nullifier_int.to_bytes(32, 'big')
+            else:
+                # Prefer the nullifier computed alongside the proof, if supplied
+                nullifier_bytes = snark_proof_payload.get("nullifier")
+                if not isinstance(nullifier_bytes, (bytes, bytearray)) or len(nullifier_bytes) != 32:
+                    nullifier_bytes = _fallback_nullifier(patient_id, pub_signals)
             
             # Compute consistency proof hash
             import json
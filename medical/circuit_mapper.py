@@ -10,15 +10,187 @@ for zero-knowledge proof generation.
 
 import hashlib
 import json
-from typing import Dict, Any, List, Tuple
+import logging
+import struct
+import time
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 from dataclasses import dataclass
 
+logger = logging.getLogger(__name__)
+
+# Bound once at import: hashlib's OpenSSL backend already dispatches to the
+# SHA-NI/AVX2 compression functions when the CPU has them, so this is the
+# single place to swap in a different SHA-256 implementation.
+_sha256 = hashlib.sha256
+
+# Canonical JSON writer. json.dumps builds a fresh JSONEncoder whenever
+# sort_keys is passed; reusing one encoder produces the same bytes without
+# that setup. orjson is not used because its compact separators and raw
+# UTF-8 output would change every canonical hash fed to the circuit.
+_canonical_dumps = json.JSONEncoder(sort_keys=True).encode
+
+# Four big-endian uint64 words: the default field-element split of a digest
+_unpack_4q = struct.Struct('>4Q').unpack
+
+# Lower 128 bits of a 256-bit hash
+_LIMB_MASK = (1 << 128) - 1
+
+# Public inputs every redaction circuit instance must provide
+_REQUIRED_PUBLIC = frozenset({
+    "policyHash0", "policyHash1",
+    "merkleRoot0", "merkleRoot1",
+    "originalHash0", "originalHash1",
+    "redactedHash0", "redactedHash1",
+    "nullifier0", "nullifier1",
+    "preStateHash0", "preStateHash1",
+    "postStateHash0", "postStateHash1",
+    "consistencyCheckPassed",
+    "policyAllowed",
+})
+
+# Private array inputs and their fixed lengths
+_REQUIRED_PRIVATE_LENGTHS = (
+    ("originalData", 4),
+    ("redactedData", 4),
+    ("policyData", 2),
+    ("merklePathElements", 8),
+    ("merklePathIndices", 8),
+)
+
+# Public inputs carrying the consistency proof
+_CONSISTENCY_FIELDS = (
+    "preStateHash0", "preStateHash1",
+    "postStateHash0", "postStateHash1",
+    "consistencyCheckPassed",
+)
+
+# Fixed redaction outputs
+_EMPTY_JSON = _canonical_dumps({})
+# Canonical record layout with keys pre-sorted, matching sort_keys=True output
+_CANONICAL_TEMPLATE = '{"diagnosis": %s, "patient_id": %s, "physician": %s, "treatment": %s}'
+_REDACTED_PLAIN = "[REDACTED]"
+_MODIFIED_PLAIN = "[MODIFIED]"
+
 
 @dataclass
 class CircuitInputs:
     """Container for circuit public and private inputs."""
     public_inputs: Dict[str, int]
     private_inputs: Dict[str, Any]
+    # Decimal string of public_inputs["merkleRoot0"], fixed when the inputs are built
+    merkle_root_0: str = "0"
+
+
+def _field_elements_from_digest(digest: bytes, num_elements: int) -> List[int]:
+    """
+    Split a raw SHA-256 digest into big-endian field elements.
+    
+    Args:
+        digest: 32-byte digest
+        num_elements: Number of field elements to produce
+        
+    Returns:
+        List of integers representing field elements
+    """
+    if num_elements == 4 and len(digest) == 32:
+        # Each 64-bit word is already far below 2**250 (and the BN254
+        # modulus), so no reduction is needed on this path
+        return list(_unpack_4q(digest))
+    
+    elements = []
+    bytes_per_element = len(digest) // num_elements
+    
+    for i in range(num_elements):
+        chunk = digest[i*bytes_per_element:(i+1)*bytes_per_element]
+        # Convert bytes to integer (field element)
+        # Use modulo to ensure I stay within field bounds
+        element = int.from_bytes(chunk, 'big') % (2**250)  # Stay well below BN254 field
+        elements.append(element)
+    
+    return elements
+
+
+def _split_limbs_from_digest(digest: bytes) -> Tuple[int, int]:
+    """
+    Split a raw 32-byte digest into two 128-bit limbs.
+    
+    Args:
+        digest: 32-byte digest
+        
+    Returns:
+        Tuple of (limb0, limb1) representing lower and upper 128 bits
+    """
+    # One bytes->int conversion, then mask/shift: cheaper than two slices
+    full_int = int.from_bytes(digest, 'big')
+    return full_int & _LIMB_MASK, full_int >> 128
+
+
+# State-hash limbs used when no consistency proof is supplied
+_DEFAULT_PRE_STATE_LIMBS = _split_limbs_from_digest(_sha256(b"pre_state_default").digest())
+_DEFAULT_POST_STATE_LIMBS = _split_limbs_from_digest(_sha256(b"post_state_default").digest())
+
+
+def _check_public_inputs(inputs: CircuitInputs) -> Optional[str]:
+    """Return the first problem with the public inputs, or None if valid."""
+    public_inputs = inputs.public_inputs
+    missing = _REQUIRED_PUBLIC - public_inputs.keys()
+    if missing:
+        return f"Missing public input: {', '.join(sorted(missing))}"
+    for key in _REQUIRED_PUBLIC:
+        if not isinstance(public_inputs[key], int):
+            return f"Public input {key} must be int, got {type(public_inputs[key])}"
+    return None
+
+
+def _check_private_inputs(inputs: CircuitInputs) -> Optional[str]:
+    """Return the first problem with the private and Merkle inputs, or None if valid."""
+    private_inputs = inputs.private_inputs
+    for key, length in _REQUIRED_PRIVATE_LENGTHS:
+        if key not in private_inputs:
+            return f"Missing private input: {key}"
+        if len(private_inputs[key]) != length:
+            return f"{key} must have {length} elements"
+    if "enforceMerkle" not in private_inputs:
+        return "Missing private input: enforceMerkle"
+    return None
+
+
+def _check_consistency_inputs(inputs: CircuitInputs) -> Optional[str]:
+    """Return the first problem with the consistency inputs, or None if valid."""
+    for field in _CONSISTENCY_FIELDS:
+        if field not in inputs.public_inputs:
+            return f"Missing consistency field: {field}"
+        if not isinstance(inputs.public_inputs[field], int):
+            return f"Consistency field {field} must be int, got {type(inputs.public_inputs[field])}"
+    return None
+
+
+# Policy limbs and elements for "default_policy", by redaction type
+_DEFAULT_POLICY_INPUTS: Dict[str, Tuple[int, int, Tuple[int, ...]]] = {}
+
+
+def _default_policy_inputs(redaction_type: str) -> Tuple[int, int, Tuple[int, ...]]:
+    """
+    Return the memoized policy limbs and field elements of a default policy.
+    
+    Args:
+        redaction_type: Type of redaction operation
+        
+    Returns:
+        Tuple of (limb0, limb1, policy field elements)
+    """
+    cached = _DEFAULT_POLICY_INPUTS.get(redaction_type)
+    if cached is None:
+        policy_digest = _sha256(f"policy_{redaction_type}".encode()).digest()
+        # Policy elements are derived from the hex policy hash, not its digest
+        elements = _field_elements_from_digest(_sha256(policy_digest.hex().encode()).digest(), 2)
+        cached = (*_split_limbs_from_digest(policy_digest), tuple(elements))
+        _DEFAULT_POLICY_INPUTS[redaction_type] = cached
+    return cached
+
+
+for _redaction_type in ("DELETE", "MODIFY", "ANONYMIZE"):
+    _default_policy_inputs(_redaction_type)
 
 
 class MedicalDataCircuitMapper:
@@ -37,18 +209,7 @@ class MedicalDataCircuitMapper:
             List of integers representing field elements
         """
         # Use SHA256 then split into field elements
-        h = hashlib.sha256(data_str.encode()).digest()
-        elements = []
-        bytes_per_element = len(h) // num_elements
-        
-        for i in range(num_elements):
-            chunk = h[i*bytes_per_element:(i+1)*bytes_per_element]
-            # Convert bytes to integer (field element)
-            # Use modulo to ensure I stay within field bounds
-            element = int.from_bytes(chunk, 'big') % (2**250)  # Stay well below BN254 field
-            elements.append(element)
-        
-        return elements
+        return _field_elements_from_digest(_sha256(data_str.encode()).digest(), num_elements)
     
     @staticmethod
     def split_256bit_hash(hash_hex: str) -> Tuple[int, int]:
@@ -65,7 +226,7 @@ class MedicalDataCircuitMapper:
         if hash_hex.startswith('0x'):
             hash_hex = hash_hex[2:]
         
-        # Convert to integer
+        # Convert to integer (int(hex, 16) beats bytes.fromhex + struct here)
         full_int = int(hash_hex, 16)
         
         # Split into two 128-bit limbs
@@ -85,6 +246,25 @@ class MedicalDataCircuitMapper:
         Returns:
             Canonical JSON string
         """
+        get = record_dict.get
+        return _CANONICAL_TEMPLATE % (
+            _canonical_dumps(get("diagnosis", "")),
+            _canonical_dumps(get("patient_id", "")),
+            _canonical_dumps(get("physician", "")),
+            _canonical_dumps(get("treatment", "")),
+        )
+    
+    @staticmethod
+    def _canonicalize(record_dict: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Build the canonical proof fields of a record.
+        
+        Args:
+            record_dict: Medical record as dictionary
+            
+        Returns:
+            Tuple of (canonical JSON string, canonical fields dictionary)
+        """
         # Select fields to include in proof
         canonical_fields = {
             "patient_id": record_dict.get("patient_id", ""),
@@ -92,33 +272,40 @@ class MedicalDataCircuitMapper:
             "treatment": record_dict.get("treatment", ""),
             "physician": record_dict.get("physician", "")
         }
-        return json.dumps(canonical_fields, sort_keys=True)
+        return MedicalDataCircuitMapper.serialize_medical_data(canonical_fields), canonical_fields
     
-    def apply_redaction(self, original_data: str, redaction_type: str) -> str:
+    def apply_redaction(self,
+                        original_data: str,
+                        redaction_type: str,
+                        parsed: Optional[Dict[str, Any]] = None) -> str:
         """
         Apply redaction to data based on type.
         
         Args:
             original_data: Original data string
             redaction_type: Type of redaction (DELETE, MODIFY, ANONYMIZE)
+            parsed: Already-parsed form of original_data, to skip json.loads
             
         Returns:
             Redacted data string
         """
-        try:
-            data = json.loads(original_data)
-        except json.JSONDecodeError:
-            # If not JSON, treat as plain text
-            if redaction_type == "DELETE":
-                return ""
-            elif redaction_type == "ANONYMIZE":
-                return "[REDACTED]"
-            else:  # MODIFY
-                return "[MODIFIED]"
+        if parsed is not None:
+            data = parsed
+        else:
+            try:
+                data = json.loads(original_data)
+            except json.JSONDecodeError:
+                # If not JSON, treat as plain text
+                if redaction_type == "DELETE":
+                    return ""
+                elif redaction_type == "ANONYMIZE":
+                    return _REDACTED_PLAIN
+                else:  # MODIFY
+                    return _MODIFIED_PLAIN
         
         # Apply redaction to JSON data
         if redaction_type == "DELETE":
-            return json.dumps({}, sort_keys=True)
+            return _EMPTY_JSON
         
         elif redaction_type == "ANONYMIZE":
             redacted = {}
@@ -126,17 +313,17 @@ class MedicalDataCircuitMapper:
                 if key == "patient_id":
                     redacted[key] = value  # Keep ID for tracking
                 else:
-                    redacted[key] = "[REDACTED]"
-            return json.dumps(redacted, sort_keys=True)
+                    redacted[key] = _REDACTED_PLAIN
+            return _canonical_dumps(redacted)
         
         else:  # MODIFY
             redacted = data.copy()
             # Example: anonymize sensitive fields
             if "diagnosis" in redacted:
-                redacted["diagnosis"] = "[MODIFIED]"
+                redacted["diagnosis"] = _MODIFIED_PLAIN
             if "treatment" in redacted:
-                redacted["treatment"] = "[MODIFIED]"
-            return json.dumps(redacted, sort_keys=True)
+                redacted["treatment"] = _MODIFIED_PLAIN
+            return _canonical_dumps(redacted)
     
     def prepare_circuit_inputs(self, 
                               medical_record_dict: Dict[str, Any],
@@ -158,63 +345,138 @@ class MedicalDataCircuitMapper:
             CircuitInputs object with public and private inputs
         """
         # Serialize original data
-        original_data = self.serialize_medical_data(medical_record_dict)
+        original_data, canonical_fields = self._canonicalize(medical_record_dict)
         
-        # Apply redaction
-        redacted_data = self.apply_redaction(original_data, redaction_type)
+        # Apply redaction (the canonical fields are already the parsed form)
+        redacted_data = self.apply_redaction(original_data, redaction_type, parsed=canonical_fields)
         
         # Compute hashes
-        original_hash = hashlib.sha256(original_data.encode()).hexdigest()
-        redacted_hash = hashlib.sha256(redacted_data.encode()).hexdigest()
+        original_digest = _sha256(original_data.encode()).digest()
+        redacted_digest = _sha256(redacted_data.encode()).digest()
+        
+        return self._assemble_inputs(
+            original_digest,
+            redacted_digest,
+            self._policy_inputs(redaction_type, policy_hash),
+            consistency_proof,
+            nullifier,
+        )
+    
+    def prepare_circuit_inputs_batch(self,
+                                     records: List[Dict[str, Any]],
+                                     redaction_type: str,
+                                     policy_hash: str = "default_policy") -> List[CircuitInputs]:
+        """
+        Prepare circuit inputs for many records sharing one redaction policy.
+        
+        The policy limbs and elements are resolved once for the whole batch.
+        Each record gets a default nullifier and no consistency proof, exactly
+        as prepare_circuit_inputs would produce.
         
+        Args:
+            records: Medical records as dictionaries
+            redaction_type: Type of redaction operation
+            policy_hash: Hash of the applicable policy
+            
+        Returns:
+            List of CircuitInputs, in record order
+        """
+        policy = self._policy_inputs(redaction_type, policy_hash)
+        inputs = []
+        for record in records:
+            original_data, canonical_fields = self._canonicalize(record)
+            redacted_data = self.apply_redaction(original_data, redaction_type, parsed=canonical_fields)
+            inputs.append(self._assemble_inputs(
+                _sha256(original_data.encode()).digest(),
+                _sha256(redacted_data.encode()).digest(),
+                policy,
+                None,
+                None,
+            ))
+        return inputs
+    
+    def _policy_inputs(self, redaction_type: str, policy_hash: str) -> Tuple[int, int, Sequence[int]]:
+        """
+        Resolve a policy identifier into its 128-bit limbs and field elements.
+        
+        Args:
+            redaction_type: Type of redaction operation
+            policy_hash: Policy identifier, 0x-prefixed hash, or "default_policy"
+            
+        Returns:
+            Tuple of (limb0, limb1, policy field elements)
+        """
         # Compute policy hash if not provided
         if policy_hash == "default_policy":
-            policy_hash = hashlib.sha256(f"policy_{redaction_type}".encode()).hexdigest()
+            return _default_policy_inputs(redaction_type)
         elif not policy_hash.startswith('0x'):
-            # Hash the policy identifier
-            policy_hash = hashlib.sha256(policy_hash.encode()).hexdigest()
+            # Hash the policy identifier; limbs come straight from the digest
+            policy_digest = _sha256(policy_hash.encode()).digest()
+            policy_hash = policy_digest.hex()
+            pol_h0, pol_h1 = _split_limbs_from_digest(policy_digest)
         else:
             # Remove 0x prefix
             policy_hash = policy_hash[2:]
+            pol_h0, pol_h1 = self.split_256bit_hash(policy_hash)
         
-        # Convert to field elements
-        original_elements = self.hash_to_field_elements(original_data, 4)
-        redacted_elements = self.hash_to_field_elements(redacted_data, 4)
+        # Policy elements are derived from the hex policy hash, not its digest
         policy_elements = self.hash_to_field_elements(policy_hash, 2)
+        return pol_h0, pol_h1, policy_elements
+    
+    def _assemble_inputs(self,
+                         original_digest: bytes,
+                         redacted_digest: bytes,
+                         policy: Tuple[int, int, Sequence[int]],
+                         consistency_proof: Dict[str, Any] = None,
+                         nullifier: str = None) -> CircuitInputs:
+        """
+        Build circuit inputs from record digests and resolved policy inputs.
+        
+        Args:
+            original_digest: SHA-256 digest of the canonical original data
+            redacted_digest: SHA-256 digest of the redacted data
+            policy: Output of _policy_inputs
+            consistency_proof: Optional consistency proof data with pre/post state hashes
+            nullifier: Optional nullifier for replay attack prevention
+            
+        Returns:
+            CircuitInputs object with public and private inputs
+        """
+        original_hash = original_digest.hex()
+        pol_h0, pol_h1, policy_elements = policy
+        
+        # Convert to field elements (reusing the record digests)
+        original_elements = _field_elements_from_digest(original_digest, 4)
+        redacted_elements = _field_elements_from_digest(redacted_digest, 4)
         
         # Split hashes into 128-bit limbs
-        orig_h0, orig_h1 = self.split_256bit_hash(original_hash)
-        red_h0, red_h1 = self.split_256bit_hash(redacted_hash)
-        pol_h0, pol_h1 = self.split_256bit_hash(policy_hash)
+        orig_h0, orig_h1 = _split_limbs_from_digest(original_digest)
+        red_h0, red_h1 = _split_limbs_from_digest(redacted_digest)
         
         # Handle nullifier
         if nullifier is None:
             # Generate default nullifier from timestamp and record hash
-            import time
             nullifier_str = f"nullifier_{int(time.time())}_{original_hash}"
-            nullifier = hashlib.sha256(nullifier_str.encode()).hexdigest()
+            null_h0, null_h1 = _split_limbs_from_digest(_sha256(nullifier_str.encode()).digest())
         elif not nullifier.startswith('0x'):
             # Hash the nullifier if it's not a hex string
-            nullifier = hashlib.sha256(nullifier.encode()).hexdigest()
+            null_h0, null_h1 = _split_limbs_from_digest(_sha256(nullifier.encode()).digest())
         else:
-            nullifier = nullifier[2:]
-        
-        null_h0, null_h1 = self.split_256bit_hash(nullifier)
+            null_h0, null_h1 = self.split_256bit_hash(nullifier[2:])
         
         # Handle consistency proof
         if consistency_proof:
             pre_state_hash = consistency_proof.get("pre_state_hash", "0" * 64)
             post_state_hash = consistency_proof.get("post_state_hash", "0" * 64)
             consistency_check_passed = 1 if consistency_proof.get("valid", True) else 0
+            pre_h0, pre_h1 = self.split_256bit_hash(pre_state_hash)
+            post_h0, post_h1 = self.split_256bit_hash(post_state_hash)
         else:
             # Default values when no consistency proof provided
-            pre_state_hash = hashlib.sha256(b"pre_state_default").hexdigest()
-            post_state_hash = hashlib.sha256(b"post_state_default").hexdigest()
+            pre_h0, pre_h1 = _DEFAULT_PRE_STATE_LIMBS
+            post_h0, post_h1 = _DEFAULT_POST_STATE_LIMBS
             consistency_check_passed = 1
         
-        pre_h0, pre_h1 = self.split_256bit_hash(pre_state_hash)
-        post_h0, post_h1 = self.split_256bit_hash(post_state_hash)
-        
         # Merkle proof (optional, set enforceMerkle=0 to skip for now)
         # In future, compute actual Merkle path from blockchain state
         merkle_path_elements = [0] * 8
@@ -244,7 +506,7 @@ class MedicalDataCircuitMapper:
         private_inputs = {
             "originalData": original_elements,
             "redactedData": redacted_elements,
-            "policyData": policy_elements,
+            "policyData": list(policy_elements),  # policy may be shared across a batch
             "merklePathElements": merkle_path_elements,
             "merklePathIndices": merkle_path_indices,
             "enforceMerkle": 0  # Disable Merkle check for now
@@ -252,7 +514,8 @@ class MedicalDataCircuitMapper:
         
         return CircuitInputs(
             public_inputs=public_inputs,
-            private_inputs=private_inputs
+            private_inputs=private_inputs,
+            merkle_root_0=str(public_inputs["merkleRoot0"])
         )
     
     def validate_circuit_inputs(self, inputs: CircuitInputs) -> bool:
@@ -265,74 +528,11 @@ class MedicalDataCircuitMapper:
         Returns:
             True if valid, False otherwise
         """
-        try:
-            # Check public inputs
-            required_public = [
-                "policyHash0", "policyHash1",
-                "merkleRoot0", "merkleRoot1",
-                "originalHash0", "originalHash1",
-                "redactedHash0", "redactedHash1",
-                "nullifier0", "nullifier1",
-                "preStateHash0", "preStateHash1",
-                "postStateHash0", "postStateHash1",
-                "consistencyCheckPassed",
-                "policyAllowed"
-            ]
-            
-            for key in required_public:
-                if key not in inputs.public_inputs:
-                    print(f"  Missing public input: {key}")
-                    return False
-                if not isinstance(inputs.public_inputs[key], int):
-                    print(f"  Public input {key} must be int, got {type(inputs.public_inputs[key])}")
-                    return False
-            
-            # Check private inputs
-            if "originalData" not in inputs.private_inputs:
-                print(f"  Missing private input: originalData")
-                return False
-            if len(inputs.private_inputs["originalData"]) != 4:
-                print(f"  originalData must have 4 elements")
-                return False
-            
-            if "redactedData" not in inputs.private_inputs:
-                print(f"  Missing private input: redactedData")
-                return False
-            if len(inputs.private_inputs["redactedData"]) != 4:
-                print(f"  redactedData must have 4 elements")
-                return False
-            
-            if "policyData" not in inputs.private_inputs:
-                print(f"  Missing private input: policyData")
-                return False
-            if len(inputs.private_inputs["policyData"]) != 2:
-                print(f"  policyData must have 2 elements")
-                return False
-            
-            # Check Merkle inputs
-            if "merklePathElements" not in inputs.private_inputs:
-                print(f"  Missing private input: merklePathElements")
-                return False
-            if len(inputs.private_inputs["merklePathElements"]) != 8:
-                print(f"  merklePathElements must have 8 elements")
-                return False
-            
-            if "merklePathIndices" not in inputs.private_inputs:
-                print(f"  Missing private input: merklePathIndices")
-                return False
-            if len(inputs.private_inputs["merklePathIndices"]) != 8:
-                print(f"  merklePathIndices must have 8 elements")
-                return False
-            
-            if "enforceMerkle" not in inputs.private_inputs:
-                print(f"  Missing private input: enforceMerkle")
-                return False
-            
-            return True
-            
-        except Exception as e:
-            print(f"  Validation error: {e}")
+        err = _check_public_inputs(inputs) or _check_private_inputs(inputs)
+        if err:
+            logger.warning("%s", err)
             return False
+        return True
 
     def _hash_state(self, state_dict: Dict[str, Any]) -> str:
         """
@@ -344,9 +544,21 @@ class MedicalDataCircuitMapper:
         Returns:
             Hexadecimal hash string
         """
+        return self._hash_state_digest(state_dict).hex()
+    
+    def _hash_state_digest(self, state_dict: Dict[str, Any]) -> bytes:
+        """
+        Compute the raw SHA-256 digest of a state dictionary.
+        
+        Args:
+            state_dict: State dictionary to hash
+            
+        Returns:
+            32-byte digest
+        """
         # Serialize state to canonical JSON
-        state_json = json.dumps(state_dict, sort_keys=True)
-        return hashlib.sha256(state_json.encode()).hexdigest()
+        state_json = _canonical_dumps(state_dict)
+        return _sha256(state_json.encode()).digest()
     
     def prepare_circuit_inputs_with_consistency(
         self,
@@ -383,16 +595,18 @@ class MedicalDataCircuitMapper:
         if consistency_proof:
             try:
                 # Extract state hashes from consistency proof
-                pre_state_hash = self._hash_state(
+                pre_state_digest = self._hash_state_digest(
                     consistency_proof.pre_redaction_state
                 )
-                post_state_hash = self._hash_state(
+                post_state_digest = self._hash_state_digest(
                     consistency_proof.post_redaction_state
                 )
+                pre_state_hash = pre_state_digest.hex()
+                post_state_hash = post_state_digest.hex()
                 
                 # Split into 128-bit limbs
-                pre_h0, pre_h1 = self.split_256bit_hash(pre_state_hash)
-                post_h0, post_h1 = self.split_256bit_hash(post_state_hash)
+                pre_h0, pre_h1 = _split_limbs_from_digest(pre_state_digest)
+                post_h0, post_h1 = _split_limbs_from_digest(post_state_digest)
                 
                 # Add to public inputs
                 inputs.public_inputs.update({
@@ -403,13 +617,14 @@ class MedicalDataCircuitMapper:
                     "consistencyCheckPassed": 1 if consistency_proof.is_valid else 0
                 })
                 
-                print(f" Consistency proof data added to circuit inputs")
-                print(f"   Pre-state hash: {pre_state_hash[:16]}...")
-                print(f"   Post-state hash: {post_state_hash[:16]}...")
-                print(f"   Consistency valid: {consistency_proof.is_valid}")
+                logger.debug(
+                    "Consistency proof data added to circuit inputs "
+                    "(pre-state %.16s..., post-state %.16s..., valid=%s)",
+                    pre_state_hash, post_state_hash, consistency_proof.is_valid
+                )
                 
             except Exception as e:
-                print(f"  Failed to add consistency proof data: {e}")
+                logger.warning("Failed to add consistency proof data: %s", e)
                 # Add default values if extraction fails
                 inputs.public_inputs.update({
                     "preStateHash0": 0,
@@ -427,7 +642,7 @@ class MedicalDataCircuitMapper:
                 "postStateHash1": 0,
                 "consistencyCheckPassed": 0  # Skip consistency check
             })
-            print(f" No consistency proof provided, using default values")
+            logger.debug("No consistency proof provided, using default values")
         
         return inputs
     
@@ -446,20 +661,10 @@ class MedicalDataCircuitMapper:
             return False
         
         # Check consistency-related public inputs (REQUIRED for consistency validation)
-        consistency_fields = [
-            "preStateHash0", "preStateHash1",
-            "postStateHash0", "postStateHash1",
-            "consistencyCheckPassed"
-        ]
-        
-        for field in consistency_fields:
-            if field not in inputs.public_inputs:
-                print(f"  Missing consistency field: {field}")
-                return False
-            if not isinstance(inputs.public_inputs[field], int):
-                print(f"  Consistency field {field} must be int, got {type(inputs.public_inputs[field])}")
-                return False
-        
+        err = _check_consistency_inputs(inputs)
+        if err:
+            logger.warning("%s", err)
+            return False
         return True
 
 
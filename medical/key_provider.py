@@ -6,11 +6,14 @@ Supports:
 """
 from __future__ import annotations
 
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Optional, Tuple, Dict, Any
 import os
 import base64
 import json
 import hashlib
+import threading
 
 try:
     from cryptography.hazmat.primitives.ciphers.aead import AESGCM  # type: ignore
@@ -20,8 +23,31 @@ except Exception:  # pragma: no cover
     Scrypt = None  # type: ignore
 
 
+# Same SHA-256 binding as medical.circuit_mapper
+_sha256 = hashlib.sha256
+
+
+@lru_cache(maxsize=128)
 def _compute_kid(key: bytes) -> str:
-    return hashlib.sha256(key).hexdigest()[:16]
+    # Providers hand out fresh key bytes, so hits rely on value equality only
+    return _sha256(key).hexdigest()[:16]
+
+
+@lru_cache(maxsize=32)
+def _make_aesgcm(aes_key: bytes):
+    # AESGCM objects are immutable for a given key, so one per KEK is shared
+    return AESGCM(aes_key)  # type: ignore
+
+
+# scrypt-derived wrapping keys, keyed by (salt, sha256(passphrase), n, r, p).
+# Bounded so the KEKs of a handful of keystores stay in process memory only.
+_KEK_CACHE_SIZE = 32
+_kek_cache: "OrderedDict[Tuple[bytes, bytes, int, int, int], bytes]" = OrderedDict()
+# Providers in different threads share the cache; scrypt itself runs unlocked
+_kek_cache_lock = threading.Lock()
+
+# Unwrapped data keys kept per FileKeyProvider, least recently used first out
+_UNWRAPPED_CACHE_SIZE = 64
 
 
 class KeyProvider:
@@ -56,21 +82,63 @@ class EnvKeyProvider(KeyProvider):
         self.key_var = key_var
         self.id_var = id_var
         self.pool_var = pool_var  # JSON mapping kid -> base64 key
+        # Parsed pool, reused while the raw env value is unchanged
+        self._pool_raw: Optional[str] = None
+        self._pool_kids: list[str] = []
+        self._pool_decoded: Dict[str, bytes] = {}
+        # Active (key, kid), reused while the key/id env values are unchanged
+        self._active_fp: Optional[Tuple[str, Optional[str]]] = None
+        self._active_cache: Tuple[Optional[bytes], Optional[str]] = (None, None)
+
+    def _get_pool(self) -> Tuple[list[str], Dict[str, bytes]]:
+        """Return (pool kids, kid -> decoded key) for the current pool env value."""
+        raw = os.getenv(self.pool_var) or ""
+        if raw == self._pool_raw:
+            return self._pool_kids, self._pool_decoded
+        kids: list[str] = []
+        decoded: Dict[str, bytes] = {}
+        if raw:
+            try:
+                pool = json.loads(raw)
+            except Exception:
+                pool = {}
+            if isinstance(pool, dict):
+                kids = list(pool.keys())
+                for kid, b64 in pool.items():
+                    if not b64:
+                        continue
+                    try:
+                        key = base64.b64decode(b64)
+                    except Exception:
+                        continue
+                    if len(key) in (16, 24, 32):
+                        decoded[kid] = key
+        self._pool_raw, self._pool_kids, self._pool_decoded = raw, kids, decoded
+        return kids, decoded
 
     def get_active_key(self) -> Tuple[Optional[bytes], Optional[str]]:
         b64 = os.getenv(self.key_var)
         if not b64:
             return None, None
+        fp = (b64, os.getenv(self.id_var))
+        if fp == self._active_fp:
+            return self._active_cache
+        self._active_cache = self._decode_active(b64, fp[1])
+        self._active_fp = fp
+        return self._active_cache
+
+    @staticmethod
+    def _decode_active(b64: str, kid: Optional[str]) -> Tuple[Optional[bytes], Optional[str]]:
         try:
             key = base64.b64decode(b64)
         except Exception:
             return None, None
         if len(key) not in (16, 24, 32):
             return None, None
-        kid = os.getenv(self.id_var) or _compute_kid(key)
-        return key, kid
+        return key, kid or _compute_kid(key)
 
     def rotate(self, new_key: Optional[bytes] = None, **kwargs) -> Tuple[Optional[bytes], Optional[str]]:
+        self._active_fp = None
         key = new_key or os.urandom(32)
         os.environ[self.key_var] = base64.b64encode(key).decode()
         kid = _compute_kid(key)
@@ -93,36 +161,14 @@ class EnvKeyProvider(KeyProvider):
         if k is not None and active_kid == kid:
             return k
         # Then check pool
-        raw = os.getenv(self.pool_var)
-        if not raw:
-            return None
-        try:
-            pool = json.loads(raw)
-        except Exception:
-            return None
-        b64 = pool.get(kid)
-        if not b64:
-            return None
-        try:
-            key = base64.b64decode(b64)
-        except Exception:
-            return None
-        if len(key) not in (16, 24, 32):
-            return None
-        return key
+        return self._get_pool()[1].get(kid)
 
     def list_kids(self) -> list[str]:
         kids: list[str] = []
         _, active_kid = self.get_active_key()
         if active_kid:
             kids.append(active_kid)
-        raw = os.getenv(self.pool_var)
-        if raw:
-            try:
-                pool = json.loads(raw)
-                kids.extend([k for k in pool.keys() if k not in kids])
-            except Exception:
-                pass
+        kids.extend([k for k in self._get_pool()[0] if k not in kids])
         return kids
 
 
@@ -136,12 +182,28 @@ class FileKeyProvider(KeyProvider):
         self.path = path
         self.passphrase = passphrase or os.getenv("IPFS_KEYSTORE_PASSPHRASE") or ""
         self._params = {"n": 2 ** 14, "r": 8, "p": 1}
+        # (mtime_ns, size) stamp, parsed keystore, and its kid -> entry index
+        self._ks_cache: Optional[Tuple[Tuple[int, int], Dict[str, Any], Dict[str, Dict[str, Any]]]] = None
+        # Unwrapped keys by (passphrase digest, salt, nonce, ciphertext)
+        self._unwrapped: "OrderedDict[Tuple[bytes, str, str, str], bytes]" = OrderedDict()
 
     def _kdf(self, salt: bytes) -> Optional[bytes]:
         if Scrypt is None:
             return None
-        kdf = Scrypt(salt=salt, length=32, n=self._params["n"], r=self._params["r"], p=self._params["p"])  # type: ignore
-        return kdf.derive(self.passphrase.encode())
+        n, r, p = self._params["n"], self._params["r"], self._params["p"]
+        cache_key = (salt, _sha256(self.passphrase.encode()).digest(), n, r, p)
+        with _kek_cache_lock:
+            aes_key = _kek_cache.get(cache_key)
+            if aes_key is not None:
+                _kek_cache.move_to_end(cache_key)
+                return aes_key
+        kdf = Scrypt(salt=salt, length=32, n=n, r=r, p=p)  # type: ignore
+        aes_key = kdf.derive(self.passphrase.encode())
+        with _kek_cache_lock:
+            _kek_cache[cache_key] = aes_key
+            if len(_kek_cache) > _KEK_CACHE_SIZE:
+                _kek_cache.popitem(last=False)
+        return aes_key
 
     def _wrap_single(self, key: bytes) -> Optional[Dict[str, Any]]:
         if AESGCM is None:
@@ -151,7 +213,7 @@ class FileKeyProvider(KeyProvider):
         if aes_key is None:
             return None
         nonce = os.urandom(12)
-        aes = AESGCM(aes_key)
+        aes = _make_aesgcm(aes_key)
         ct = aes.encrypt(nonce, key, None)
         entry = {
             "salt": base64.b64encode(salt).decode(),
@@ -166,41 +228,67 @@ class FileKeyProvider(KeyProvider):
         if AESGCM is None:
             return None
         try:
-            salt = base64.b64decode(env.get("salt", ""))
-            nonce = base64.b64decode(env.get("nonce", ""))
-            ct = base64.b64decode(env.get("ciphertext", ""))
-            aes_key = self._kdf(salt)
-            if aes_key is None:
-                return None
-            aes = AESGCM(aes_key)
-            key = aes.decrypt(nonce, ct, None)
+            cache_key = (
+                _sha256(self.passphrase.encode()).digest(),
+                env.get("salt", ""),
+                env.get("nonce", ""),
+                env.get("ciphertext", ""),
+            )
+            key = self._unwrapped.get(cache_key)
+            if key is None:
+                salt = base64.b64decode(env.get("salt", ""))
+                nonce = base64.b64decode(env.get("nonce", ""))
+                ct = base64.b64decode(env.get("ciphertext", ""))
+                aes_key = self._kdf(salt)
+                if aes_key is None:
+                    return None
+                aes = _make_aesgcm(aes_key)
+                key = aes.decrypt(nonce, ct, None)
+                self._unwrapped[cache_key] = key
+                if len(self._unwrapped) > _UNWRAPPED_CACHE_SIZE:
+                    self._unwrapped.popitem(last=False)
+            else:
+                self._unwrapped.move_to_end(cache_key)
             kid = env.get("kid") or _compute_kid(key)
             return key, kid
         except Exception:
             return None
 
     def _load_keystore(self) -> Optional[Dict[str, Any]]:
-        if not os.path.exists(self.path):
-            return None
+        return self._load_keystore_indexed()[0]
+
+    def _load_keystore_indexed(self) -> Tuple[Optional[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """Return (keystore, kid -> entry index), re-reading only when the file changed."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None, {}
+        stamp = (st.st_mtime_ns, st.st_size)
+        if self._ks_cache is not None and self._ks_cache[0] == stamp:
+            return self._ks_cache[1], self._ks_cache[2]
         try:
             with open(self.path, "r") as f:
                 env = json.load(f)
-            return env
         except Exception:
-            return None
+            return None, {}
+        by_kid: Dict[str, Dict[str, Any]] = {}
+        if isinstance(env, dict):
+            for entry in env.get("keys", []):
+                # First entry wins, matching the previous linear scan
+                by_kid.setdefault(entry.get("kid"), entry)
+        self._ks_cache = (stamp, env, by_kid)
+        return env, by_kid
 
     def get_active_key(self) -> Tuple[Optional[bytes], Optional[str]]:
-        env = self._load_keystore()
+        env, by_kid = self._load_keystore_indexed()
         if env is None:
             return None, None
         # Multi-key format
         if isinstance(env, dict) and "keys" in env:
-            active = env.get("active")
-            for entry in env.get("keys", []):
-                if entry.get("kid") == active:
-                    res = self._unwrap_single(entry)
-                    if res:
-                        return res
+            entry = by_kid.get(env.get("active"))
+            res = self._unwrap_single(entry) if entry is not None else None
+            if res:
+                return res
             return None, None
         # Single-key legacy format
         self._params = env.get("params", self._params)
@@ -239,21 +327,22 @@ class FileKeyProvider(KeyProvider):
                 "keys": [entry],
                 "active": entry["kid"],
             }
+        self._ks_cache = None
         with open(self.path, "w") as f:
             json.dump(env, f)
         return key, entry["kid"]
 
     def resolve_key(self, kid: str) -> Optional[bytes]:
-        env = self._load_keystore()
+        env, by_kid = self._load_keystore_indexed()
         if not env:
             return None
         # Multi-key
         if "keys" in env:
-            for entry in env.get("keys", []):
-                if entry.get("kid") == kid:
-                    res = self._unwrap_single(entry)
-                    return res[0] if res else None
-            return None
+            entry = by_kid.get(kid)
+            if entry is None:
+                return None
+            res = self._unwrap_single(entry)
+            return res[0] if res else None
         # Single-key
         res = self._unwrap_single(env)
         if res and (env.get("kid") == kid or kid == _compute_kid(res[0])):
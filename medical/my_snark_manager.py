@@ -10,21 +10,81 @@ SNARK proof generation.
 ### Bookmark1 for next meeting
 """
 
+import asyncio
+import hashlib
 import json
+import logging
+import os
+import threading
 import time
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
 
 from ZK.SNARKs import ZKProof
 
+logger = logging.getLogger(__name__)
+
 try:
     from medical.circuit_mapper import MedicalDataCircuitMapper
 except ImportError:
     MedicalDataCircuitMapper = None  # type: ignore
 
-try:
-    from adapters.snark import SnarkClient
-except ImportError:
-    SnarkClient = None  # type: ignore
+# Compact encoding for the stored proof payloads; readers only json.loads them
+_dumps = json.JSONEncoder(separators=(",", ":")).encode
+
+# Proof id and nullifier prefixes for real Groth16 proofs
+_PROOF_PREFIX = "real_groth16_"
+_CONSISTENCY_PROOF_PREFIX = "real_groth16_consistency_"
+_NULLIFIER_PREFIX = "nullifier_real_"
+
+# Number of successfully verified (proof, public signals) pairs remembered
+_VERIFY_CACHE_SIZE = 1024
+
+
+def _sigs_tag(pub_signals: List[Any]) -> str:
+    """Stable 16-hex-digit tag of a public signal list, used in proof ids."""
+    h = hashlib.blake2b(digest_size=8)
+    for signal in pub_signals:
+        h.update(str(signal).encode())
+        h.update(b",")
+    return h.hexdigest()
+
+
+# 256-bit hashes carried as (low, high) 128-bit limb pairs in the public
+# signals, by name and index of the low limb
+_NAMED_HASHES = (
+    ("policyHash", 0),
+    ("merkleRoot", 2),
+    ("originalHash", 4),
+    ("redactedHash", 6),
+    ("nullifier", 8),
+    ("preStateHash", 10),
+    ("postStateHash", 12),
+)
+
+
+def _combine_limbs(pub_signals: List[Any], start: int) -> str:
+    """Rebuild the 64-hex-digit hash whose limbs start at pub_signals[start]."""
+    value = int(pub_signals[start]) | (int(pub_signals[start + 1]) << 128)
+    return value.to_bytes(32, "big").hex()
+
+
+# Default policy identifiers, built once instead of formatted per request
+_DEFAULT_POLICY = {rt: f"policy_{rt}" for rt in ("DELETE", "MODIFY", "ANONYMIZE")}
+
+# Construction already requires a ready client, so the mode never changes
+_MODE_INFO = {
+    "mode": "REAL",
+    "backend": "circom/snarkjs",
+    "circuit": "redaction.circom",
+    "proof_system": "Groth16",
+    "circuit_mapper": "enabled"
+}
+
+# Requests in flight during batch proving by default: one solving its
+# witness while the previous one is in groth16 prove
+_PIPELINE_DEPTH = 2
 
 
 class EnhancedHybridSNARKManager:
@@ -37,23 +97,32 @@ class EnhancedHybridSNARKManager:
     3. Provides detailed diagnostics for proof generation
     """
     
-    def __init__(self, snark_client: Optional[Any] = None):
+    def __init__(self, snark_client: Optional[Any] = None, trust_mapper: bool = False):
         """
         Initialize the my hybrid SNARK manager.
         
         Args:
             snark_client: Optional SnarkClient instance for real proof generation
+            trust_mapper: Skip re-validating the inputs the circuit mapper just
+                produced; end-to-end tests should keep this False
         """
         if snark_client is None:
             from adapters.snark import SnarkClient
+            # The constructor already raises when artifacts are missing
             snark_client = SnarkClient()
-        if not hasattr(snark_client, 'is_available') or not snark_client.is_available():
+        elif not hasattr(snark_client, 'is_available') or not snark_client.is_available():
             raise ValueError("EnhancedHybridSNARKManager requires a ready SnarkClient with circuit artifacts")
         if MedicalDataCircuitMapper is None:
             raise ImportError("MedicalDataCircuitMapper is required for real SNARK proofs")
 
         self.snark_client = snark_client
         self.circuit_mapper = MedicalDataCircuitMapper()
+        self.trust_mapper = trust_mapper
+        # Keep the proving key hot before the first proof is requested
+        if hasattr(snark_client, 'warmup'):
+            snark_client.warmup()
+        self._verified: "OrderedDict[bytes, None]" = OrderedDict()
+        self._verified_lock = threading.Lock()
     
     def _extract_medical_record_dict(self, redaction_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -67,16 +136,24 @@ class EnhancedHybridSNARKManager:
         """
         original_data = redaction_data.get("original_data", "{}")
         
-        try:
-            # Try to parse as JSON (from medical record)
-            record_dict = json.loads(original_data)
-            
-            # If it's already a complete dict, use it
-            if isinstance(record_dict, dict) and "patient_id" in record_dict:
-                return record_dict
+        # In-process callers may hand over the record dict directly
+        if isinstance(original_data, dict):
+            if "patient_id" in original_data:
+                return original_data
+            return {**original_data, "patient_id": redaction_data.get("request_id", "unknown")}
+        
+        # Free-text payloads cannot hold a record; skip the failing parse
+        if not isinstance(original_data, str) or original_data.lstrip()[:1] == "{":
+            try:
+                # Try to parse as JSON (from medical record)
+                record_dict = json.loads(original_data)
                 
-        except (json.JSONDecodeError, TypeError):
-            pass
+                # If it's already a complete dict, use it
+                if isinstance(record_dict, dict) and "patient_id" in record_dict:
+                    return record_dict
+                    
+            except (json.JSONDecodeError, TypeError):
+                pass
         
         # Fallback: construct minimal record
         return {
@@ -97,62 +174,72 @@ class EnhancedHybridSNARKManager:
             ZKProof object if successful, None otherwise
         """
         try:
-            print(f" Generating real SNARK proof...")
-            
-            # Extract medical record
-            medical_record_dict = self._extract_medical_record_dict(redaction_data)
-            
-            # Get redaction type and policy
-            redaction_type = redaction_data.get("redaction_type", "MODIFY")
-            policy_hash = redaction_data.get("policy_hash", f"policy_{redaction_type}")
-            
-            # Use circuit mapper to prepare inputs
-            circuit_inputs = self.circuit_mapper.prepare_circuit_inputs(
-                medical_record_dict,
-                redaction_type,
-                policy_hash
-            )
-            
-            # Validate inputs
-            if not self.circuit_mapper.validate_circuit_inputs(circuit_inputs):
-                print(f"  Circuit input validation failed")
-                raise ValueError("Invalid circuit inputs")
-            
-            print(f"   Circuit inputs prepared and validated")
-            
-            # Generate real SNARK proof using snarkjs
-            result = self.snark_client.prove_redaction(
-                circuit_inputs.public_inputs,
-                circuit_inputs.private_inputs
-            )
-            
-            if not result or not result.get("verified"):
-                print(f"  Real SNARK proof verification failed")
-                raise ValueError("Proof verification failed")
+            logger.info("Generating real SNARK proof")
+            return self._generate_real_proof(redaction_data)
+        except Exception as e:
+            logger.warning("Real SNARK proof generation failed: %s", e)
+            return None
+    
+    async def create_redaction_proof_async(self,
+                                           redaction_data: Dict[str, Any],
+                                           executor: Optional[ThreadPoolExecutor] = None) -> Optional[ZKProof]:
+        """
+        Create a redaction proof without blocking the event loop.
+        
+        Args:
+            redaction_data: Dictionary containing redaction request details
+            executor: Executor to run proof generation on (default loop executor if None)
             
-            # Extract calldata
-            calldata = result.get("calldata", {})
-            pub_signals = calldata.get("pubSignals", [])
-            if not pub_signals:
-                raise ValueError("Missing public signals from proof result")
+        Returns:
+            ZKProof object if successful, None otherwise
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.create_redaction_proof, redaction_data)
+    
+    async def create_redaction_proofs_async(self,
+                                            items: List[Dict[str, Any]],
+                                            max_workers: Optional[int] = _PIPELINE_DEPTH) -> List[Optional[ZKProof]]:
+        """
+        Create proofs for many redaction requests with overlapping stages.
+        
+        Witness generation and groth16 proving both run in snarkjs child
+        processes that write per-call files, so requests in flight run
+        their stages side by side. Two in flight keeps the witness of
+        request N+1 solving while request N is proved; raising max_workers
+        proves more requests at once.
+        
+        Args:
+            items: Redaction request dictionaries
+            max_workers: Requests in flight at once (None for one per CPU)
             
-            # Create ZKProof object compatible with existing system
-            proof = ZKProof(
-                proof_id=f"real_groth16_{int(time.time())}_{hash(str(pub_signals)) % 10000}",
-                operation_type=redaction_type,
-                commitment=str(pub_signals[0]),
-                nullifier=f"nullifier_real_{int(time.time())}",
-                merkle_root=str(circuit_inputs.public_inputs.get("merkleRoot0", 0)),
-                timestamp=int(time.time()),
-                verifier_challenge=json.dumps(result.get("proof", {})),
-                prover_response=json.dumps(pub_signals)
-            )
+        Returns:
+            List of ZKProof objects (None for failed requests), in input order
+        """
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        semaphore = asyncio.Semaphore(max_workers)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            async def run(item: Dict[str, Any]) -> Optional[ZKProof]:
+                async with semaphore:
+                    return await self.create_redaction_proof_async(item, executor)
             
-            return proof
+            return list(await asyncio.gather(*(run(item) for item in items)))
+    
+    def create_redaction_proofs_batch(self,
+                                      items: List[Dict[str, Any]],
+                                      max_workers: Optional[int] = _PIPELINE_DEPTH) -> List[Optional[ZKProof]]:
+        """
+        Synchronous wrapper around create_redaction_proofs_async.
+        
+        Args:
+            items: Redaction request dictionaries
+            max_workers: Requests in flight at once (None for one per CPU)
             
-        except Exception as e:
-            print(f"  Real SNARK proof generation failed: {e}")
-            return None
+        Returns:
+            List of ZKProof objects (None for failed requests), in input order
+        """
+        return asyncio.run(self.create_redaction_proofs_async(items, max_workers))
     
     def create_redaction_proof_with_consistency(
         self,
@@ -170,61 +257,94 @@ class EnhancedHybridSNARKManager:
             ZKProof object if successful, None otherwise
         """
         try:
-            print(f" Generating real SNARK proof WITH consistency verification...")
-            
-            # Extract medical record
-            medical_record_dict = self._extract_medical_record_dict(redaction_data)
+            logger.info("Generating real SNARK proof WITH consistency verification")
+            return self._generate_real_proof(redaction_data, consistency_proof, with_consistency=True)
+        except Exception as e:
+            logger.warning("Real SNARK proof with consistency generation failed: %s", e)
+            return None
+    
+    def _generate_real_proof(
+        self,
+        redaction_data: Dict[str, Any],
+        consistency_proof=None,  # Optional ConsistencyProof
+        with_consistency: bool = False
+    ) -> ZKProof:
+        """
+        Generate a real Groth16 redaction proof, optionally with consistency.
+        
+        Args:
+            redaction_data: Dictionary containing redaction request details
+            consistency_proof: Optional ConsistencyProof object to integrate
+            with_consistency: Bind an explicit nullifier and consistency data
             
-            # Get redaction type and policy
-            redaction_type = redaction_data.get("redaction_type", "MODIFY")
-            policy_hash = redaction_data.get("policy_hash", f"policy_{redaction_type}")
+        Returns:
+            ZKProof object
             
+        Raises:
+            ValueError: If inputs are invalid or proof generation fails
+        """
+        label = " (with consistency)" if with_consistency else ""
+        
+        # Extract medical record
+        medical_record_dict = self._extract_medical_record_dict(redaction_data)
+        now = time.time_ns() // 1_000_000_000
+        
+        # Get redaction type and policy
+        redaction_type = redaction_data.get("redaction_type", "MODIFY")
+        if "policy_hash" in redaction_data:
+            policy_hash = redaction_data["policy_hash"]
+        else:
+            policy_hash = _DEFAULT_POLICY.get(redaction_type) or f"policy_{redaction_type}"
+        
+        nullifier = None
+        consistency_data = None
+        if with_consistency:
             # Generate nullifier
-            import hashlib
-            nullifier_seed = f"{redaction_data.get('request_id', 'unknown')}_{int(time.time())}"
+            request_id = redaction_data.get('request_id', 'unknown')
+            nullifier_seed = f"{request_id}_{now}"
             nullifier = hashlib.sha256(nullifier_seed.encode()).hexdigest()
             
             # Extract consistency proof data
-            consistency_data = None
             if consistency_proof:
                 consistency_data = {
                     "pre_state_hash": consistency_proof.pre_state_hash if hasattr(consistency_proof, 'pre_state_hash') else "0" * 64,
                     "post_state_hash": consistency_proof.post_state_hash if hasattr(consistency_proof, 'post_state_hash') else "0" * 64,
                     "valid": consistency_proof.is_valid if hasattr(consistency_proof, 'is_valid') else True
                 }
-            
-            # Use circuit mapper to prepare inputs WITH consistency proof
-            circuit_inputs = self.circuit_mapper.prepare_circuit_inputs(
-                medical_record_dict,
-                redaction_type,
-                policy_hash,
-                consistency_proof=consistency_data,
-                nullifier=nullifier
-            )
-            
-            # Validate inputs with consistency
-            if not self.circuit_mapper.validate_circuit_inputs(circuit_inputs):
-                print(f"  Circuit input validation failed (with consistency)")
-                raise ValueError("Invalid circuit inputs with consistency")
-            
-            print(f"   Circuit inputs prepared and validated (with consistency)")
-            
-            # Generate real SNARK proof using snarkjs
-            result = self.snark_client.prove_redaction(
-                circuit_inputs.public_inputs,
-                circuit_inputs.private_inputs
-            )
-            
-            if not result or not result.get("verified"):
-                print(f"  Real SNARK proof verification failed")
-                raise ValueError("Proof verification failed")
-            
-            # Extract calldata
-            calldata = result.get("calldata", {})
-            pub_signals = calldata.get("pubSignals", [])
-            if not pub_signals:
-                raise ValueError("Missing public signals from proof result")
-            
+        
+        # Use circuit mapper to prepare inputs
+        circuit_inputs = self.circuit_mapper.prepare_circuit_inputs(
+            medical_record_dict,
+            redaction_type,
+            policy_hash,
+            consistency_proof=consistency_data,
+            nullifier=nullifier
+        )
+        
+        # Validate inputs; snarkjs still rejects malformed witnesses either way
+        if not self.trust_mapper and not self.circuit_mapper.validate_circuit_inputs(circuit_inputs):
+            logger.warning("Circuit input validation failed%s", label)
+            raise ValueError(f"Invalid circuit inputs{' with consistency' if with_consistency else ''}")
+        
+        logger.debug("Circuit inputs prepared and validated%s", label)
+        
+        # Generate real SNARK proof using snarkjs
+        result = self.snark_client.prove_redaction(
+            circuit_inputs.public_inputs,
+            circuit_inputs.private_inputs
+        )
+        
+        if not result or not result.get("verified"):
+            logger.warning("Real SNARK proof verification failed")
+            raise ValueError("Proof verification failed")
+        
+        # Extract calldata
+        calldata = result.get("calldata", {})
+        pub_signals = calldata.get("pubSignals", [])
+        if not pub_signals:
+            raise ValueError("Missing public signals from proof result")
+        
+        if with_consistency:
             # Extract nullifier from public signals (indices 8, 9 based on my circuit)
             # Public signal order: policyHash0, policyHash1, merkleRoot0, merkleRoot1,
             #                      originalHash0, originalHash1, redactedHash0, redactedHash1,
@@ -233,28 +353,26 @@ class EnhancedHybridSNARKManager:
             nullifier_from_proof = None
             if len(pub_signals) >= 10:
                 # Reconstruct nullifier from limbs (indices 8 and 9)
-                null_limb0 = int(pub_signals[8])
-                null_limb1 = int(pub_signals[9])
-                nullifier_int = null_limb0 + (null_limb1 << 128)
-                nullifier_from_proof = hex(nullifier_int)[2:].zfill(64)
-            
-            # Create ZKProof object compatible with existing system
-            proof = ZKProof(
-                proof_id=f"real_groth16_consistency_{int(time.time())}_{hash(str(pub_signals)) % 10000}",
-                operation_type=redaction_type,
-                commitment=str(pub_signals[0]),
-                nullifier=nullifier_from_proof or f"nullifier_{nullifier[:16]}",
-                merkle_root=str(circuit_inputs.public_inputs.get("merkleRoot0", 0)),
-                timestamp=int(time.time()),
-                verifier_challenge=json.dumps(result.get("proof", {})),
-                prover_response=json.dumps(pub_signals)
-            )
-            
-            return proof
-            
-        except Exception as e:
-            print(f"  Real SNARK proof with consistency generation failed: {e}")
-            return None
+                nullifier_from_proof = _combine_limbs(pub_signals, 8)
+            proof_id = f"{_CONSISTENCY_PROOF_PREFIX}{now}_{_sigs_tag(pub_signals)}"
+            proof_nullifier = nullifier_from_proof or f"nullifier_{nullifier[:16]}"
+        else:
+            proof_id = f"{_PROOF_PREFIX}{now}_{_sigs_tag(pub_signals)}"
+            proof_nullifier = f"{_NULLIFIER_PREFIX}{now}"
+        
+        # Create ZKProof object compatible with existing system
+        proof = ZKProof(
+            proof_id=proof_id,
+            operation_type=redaction_type,
+            commitment=str(pub_signals[0]),
+            nullifier=proof_nullifier,
+            merkle_root=circuit_inputs.merkle_root_0,
+            timestamp=now,
+            verifier_challenge=result.get("proof_raw") or _dumps(result.get("proof", {})),
+            prover_response=_dumps(pub_signals)
+        )
+        
+        return proof
     
     def verify_redaction_proof(self, proof: ZKProof, public_inputs: Dict[str, Any]) -> bool:
         """
@@ -268,16 +386,62 @@ class EnhancedHybridSNARKManager:
             True if proof is valid, False otherwise
         """
         try:
+            # Groth16 verification is deterministic, so a pair that already
+            # passed the pairing check does not need snarkjs again
+            key = hashlib.blake2b(
+                f"{proof.verifier_challenge}\0{proof.prover_response}".encode(),
+                digest_size=16
+            ).digest()
+            with self._verified_lock:
+                if key in self._verified:
+                    self._verified.move_to_end(key)
+                    return True
+            
             proof_payload = json.loads(proof.verifier_challenge)
             public_signals = json.loads(proof.prover_response)
             is_valid = self.snark_client.verify_proof(proof_payload, public_signals)
             if not is_valid:
-                print(f" Proof {proof.proof_id} failed verification")
+                logger.warning("Proof %s failed verification", proof.proof_id)
+                return is_valid
+            
+            with self._verified_lock:
+                self._verified[key] = None
+                if len(self._verified) > _VERIFY_CACHE_SIZE:
+                    self._verified.popitem(last=False)
             return is_valid
         except Exception as e:
-            print(f" Verification error for proof {proof.proof_id}: {e}")
+            logger.warning("Verification error for proof %s: %s", proof.proof_id, e)
             return False
     
+    def verify_redaction_proofs(self,
+                                proofs: List[ZKProof],
+                                public_inputs_list: Optional[List[Dict[str, Any]]] = None,
+                                max_workers: Optional[int] = None) -> List[bool]:
+        """
+        Verify several redaction proofs concurrently.
+        
+        Each verification is a snarkjs child process, so running them on a
+        thread pool checks a queue of proofs in roughly the time of the
+        slowest one. Proofs that already verified are answered from cache.
+        
+        Args:
+            proofs: ZKProofs to verify
+            public_inputs_list: Public inputs per proof (empty dicts if None)
+            max_workers: Verifications in flight at once (None for one per CPU)
+            
+        Returns:
+            List of verification results, in input order
+        """
+        if not proofs:
+            return []
+        if public_inputs_list is None:
+            public_inputs_list = [{}] * len(proofs)
+        if len(public_inputs_list) != len(proofs):
+            raise ValueError("public_inputs_list must match proofs in length")
+        workers = min(len(proofs), max_workers or os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.verify_redaction_proof, proofs, public_inputs_list))
+    
     def get_proof_metadata(self, proof: ZKProof) -> Dict[str, Any]:
         """
         Get metadata about a proof.
@@ -286,9 +450,10 @@ class EnhancedHybridSNARKManager:
             proof: ZKProof to get metadata for
             
         Returns:
-            Dictionary with proof metadata
+            Dictionary with proof metadata, including the 256-bit hashes
+            rebuilt from the public signal limbs when all of them are present
         """
-        return {
+        metadata = {
             "proof_id": proof.proof_id,
             "operation_type": proof.operation_type,
             "mode": "REAL_GROTH16",
@@ -297,6 +462,19 @@ class EnhancedHybridSNARKManager:
             "nullifier": proof.nullifier,
             "merkle_root": proof.merkle_root
         }
+        try:
+            pub_signals = json.loads(proof.prover_response)
+        except (json.JSONDecodeError, TypeError):
+            pub_signals = []
+        if isinstance(pub_signals, list) and len(pub_signals) >= 2 * len(_NAMED_HASHES):
+            try:
+                metadata["reconstructed_hashes"] = {
+                    name: _combine_limbs(pub_signals, start) for name, start in _NAMED_HASHES
+                }
+            except (ValueError, IndexError, TypeError, OverflowError):
+                # Signals that are not field-element limbs; leave the hashes out
+                pass
+        return metadata
     
     def is_real_mode_available(self) -> bool:
         """
@@ -314,17 +492,12 @@ class EnhancedHybridSNARKManager:
         Returns:
             Dictionary with mode information
         """
-        return {
-            "mode": "REAL",
-            "backend": "circom/snarkjs",
-            "circuit": "redaction.circom",
-            "proof_system": "Groth16",
-            "circuit_mapper": "enabled"
-        }
+        return dict(_MODE_INFO)
 
 
 # Example usage and testing
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     print("\n" + "="*60)
     print("Enhanced Hybrid SNARK Manager Test")
     print("="*60)
@@ -14,16 +14,23 @@ Usage:
     pytest tests/test_integration.py -v  # Run specific integration tests
 """
 
+import asyncio
 import os
 import sys
 import time
 import json
+import re
+import functools
 import subprocess
+import shutil
 import tempfile
 import threading
 import socket
+import http.client
+import urllib.request
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Callable, Optional, Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 import pytest
 
@@ -41,9 +48,63 @@ def pytest_sessionstart(session):
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from adapters.config import env_bool, env_str
-from adapters.evm import EVMClient
-from adapters.ipfs import get_ipfs_client
+# Hardhat project used by the EVM services; resolved once per session
+CONTRACTS_DIR = project_root / "contracts"
+_CONTRACTS_OK = CONTRACTS_DIR.is_dir()
+
+# "<Contract> [(variant)] deployed at: 0x..." lines printed by scripts/deploy.js
+_DEPLOYED_AT_RE = re.compile(r'^(\w+)[^\n]*?deployed at:\s*(0x[0-9a-fA-F]{40})', re.MULTILINE)
+
+
+def _hardhat_ready(port: int) -> bool:
+    """True once the Hardhat node answers an eth_chainId request."""
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}",
+        data=b'{"jsonrpc":"2.0","id":1,"method":"eth_chainId","params":[]}',
+        headers={"Content-Type": "application/json"}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=0.5) as response:
+            return response.status == 200
+    except (OSError, http.client.HTTPException):
+        return False
+
+
+def _ipfs_ready(port: int) -> bool:
+    """True once the IPFS API answers /api/v0/id."""
+    request = urllib.request.Request(f"http://127.0.0.1:{port}/api/v0/id", method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=0.5) as response:
+            return response.status == 200
+    except (OSError, http.client.HTTPException):
+        return False
+
+
+def _wait_until_ready(is_ready: Callable[[int], bool], port: int, total_timeout: float = 30.0) -> bool:
+    """Poll a readiness check until it passes or the time budget runs out.
+    
+    Both daemons open their port before they can serve requests, so the
+    checks talk HTTP rather than just connecting. Polls back off
+    exponentially from 25 ms up to 500 ms, so a daemon that is up in a
+    fraction of a second is noticed right away.
+    """
+    deadline = time.monotonic() + total_timeout
+    attempt = 0
+    while not is_ready(port):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(0.5, 0.025 * (1.6 ** attempt), remaining))
+        attempt += 1
+    return True
+
+
+def _ask_kernel_for_port() -> int:
+    """Let the kernel pick a free local port with a single bind to port 0."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
 
 
 class ServiceManager:
@@ -54,6 +115,7 @@ class ServiceManager:
         self.ipfs_process = None
         self.hardhat_port = None
         self.ipfs_port = None
+        self.ipfs_repo = None
         self.contracts_deployed = False
         self.deployment_addresses = {}
         
@@ -61,8 +123,10 @@ class ServiceManager:
         """Find a free port starting from the given port."""
         for port in range(start_port, start_port + 100):
             with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+                # Ports left in TIME_WAIT by an earlier run are free for the daemons
+                s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
                 try:
-                    s.bind(('localhost', port))
+                    s.bind(('127.0.0.1', port))
                     return port
                 except OSError:
                     continue
@@ -71,38 +135,28 @@ class ServiceManager:
     def start_hardhat_node(self) -> bool:
         """Start Hardhat node for EVM testing."""
         try:
-            # Find free port
+            # deploy.js runs against Hardhat's built-in "localhost" network,
+            # which is fixed to 127.0.0.1:8545, so keep the scan from 8545
             self.hardhat_port = self.find_free_port(8545)
             
-            contracts_dir = project_root / "contracts"
-            if not contracts_dir.exists():
-                print(f"Contracts directory not found: {contracts_dir}")
+            if not _CONTRACTS_OK:
+                print(f"Contracts directory not found: {CONTRACTS_DIR}")
                 return False
             
             # Start Hardhat node
             cmd = ["npx", "hardhat", "node", "--port", str(self.hardhat_port)]
             self.hardhat_process = subprocess.Popen(
                 cmd,
-                cwd=contracts_dir,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
+                cwd=CONTRACTS_DIR,
+                # Nothing reads the node's output; an undrained pipe would stall it
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
             )
             
             # Wait for node to start
-            max_attempts = 30
-            for attempt in range(max_attempts):
-                try:
-                    # Test connection
-                    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                        s.settimeout(1)
-                        result = s.connect_ex(('localhost', self.hardhat_port))
-                        if result == 0:
-                            print(f"Hardhat node started on port {self.hardhat_port}")
-                            return True
-                except:
-                    pass
-                time.sleep(1)
+            if _wait_until_ready(_hardhat_ready, self.hardhat_port):
+                print(f"Hardhat node started on port {self.hardhat_port}")
+                return True
             
             print("Failed to start Hardhat node")
             self.stop_hardhat_node()
@@ -140,49 +194,39 @@ class ServiceManager:
                 print("IPFS not available")
                 return False
             
-            # Find free port for IPFS API
-            self.ipfs_port = self.find_free_port(5001)
+            # Nothing depends on a fixed IPFS API port
+            self.ipfs_port = _ask_kernel_for_port()
+            
+            # The repository must outlive this call; stop_ipfs_daemon removes it
+            self.ipfs_repo = tempfile.mkdtemp(prefix='ipfs-')
+            env = os.environ.copy()
+            env['IPFS_PATH'] = self.ipfs_repo
+            
+            # Initialize repository
+            subprocess.run(
+                ["ipfs", "init"],
+                env=env,
+                capture_output=True,
+                timeout=30
+            )
+            
+            # Configure API port
+            subprocess.run([
+                "ipfs", "config", "Addresses.API", f"/ip4/127.0.0.1/tcp/{self.ipfs_port}"
+            ], env=env, capture_output=True)
+            
+            # Start daemon
+            self.ipfs_process = subprocess.Popen(
+                ["ipfs", "daemon"],
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
             
-            # Create temporary IPFS repository
-            with tempfile.TemporaryDirectory() as temp_repo:
-                env = os.environ.copy()
-                env['IPFS_PATH'] = temp_repo
-                
-                # Initialize repository
-                subprocess.run(
-                    ["ipfs", "init"],
-                    env=env,
-                    capture_output=True,
-                    timeout=30
-                )
-                
-                # Configure API port
-                subprocess.run([
-                    "ipfs", "config", "Addresses.API", f"/ip4/127.0.0.1/tcp/{self.ipfs_port}"
-                ], env=env, capture_output=True)
-                
-                # Start daemon
-                self.ipfs_process = subprocess.Popen(
-                    ["ipfs", "daemon"],
-                    env=env,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True
-                )
-                
-                # Wait for daemon to start
-                max_attempts = 30
-                for attempt in range(max_attempts):
-                    try:
-                        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                            s.settimeout(1)
-                            result = s.connect_ex(('localhost', self.ipfs_port))
-                            if result == 0:
-                                print(f"IPFS daemon started on port {self.ipfs_port}")
-                                return True
-                    except:
-                        pass
-                    time.sleep(1)
+            # Wait for daemon to start
+            if _wait_until_ready(_ipfs_ready, self.ipfs_port):
+                print(f"IPFS daemon started on port {self.ipfs_port}")
+                return True
             
             print("Failed to start IPFS daemon")
             self.stop_ipfs_daemon()
@@ -205,11 +249,16 @@ class ServiceManager:
                 pass
             self.ipfs_process = None
             self.ipfs_port = None
+        if self.ipfs_repo:
+            shutil.rmtree(self.ipfs_repo, ignore_errors=True)
+            self.ipfs_repo = None
     
     def deploy_contracts(self) -> bool:
         """Deploy contracts to the running Hardhat node."""
         try:
-            contracts_dir = project_root / "contracts"
+            if not _CONTRACTS_OK:
+                print(f"Contracts directory not found: {CONTRACTS_DIR}")
+                return False
             
             # Set environment for deployment
             env = os.environ.copy()
@@ -218,7 +267,7 @@ class ServiceManager:
             # Run deployment script
             result = subprocess.run(
                 ["npx", "hardhat", "run", "scripts/deploy.js", "--network", "localhost"],
-                cwd=contracts_dir,
+                cwd=CONTRACTS_DIR,
                 env=env,
                 capture_output=True,
                 text=True,
@@ -228,18 +277,11 @@ class ServiceManager:
             if result.returncode == 0:
                 # Parse deployment addresses from output
                 try:
-                    output_lines = result.stdout.split('\n')
-                    for line in output_lines:
-                        if "deployed at:" in line.lower():
-                            if "MedicalDataManager" in line:
-                                address = line.split("deployed at:")[-1].strip()
-                                self.deployment_addresses['MedicalDataManager'] = address
-                            elif "RedactionVerifier" in line:
-                                address = line.split("deployed at:")[-1].strip()
-                                self.deployment_addresses['RedactionVerifier'] = address
+                    for match in _DEPLOYED_AT_RE.finditer(result.stdout):
+                        self.deployment_addresses[match.group(1)] = match.group(2)
                     
-                    # Also try to read from deployed_addresses.json
-                    deployed_file = contracts_dir / "deployed_addresses.json"
+                    # Also read deployed_addresses.json, which keeps entries from other deploy scripts
+                    deployed_file = CONTRACTS_DIR / "deployed_addresses.json"
                     if deployed_file.exists():
                         with open(deployed_file) as f:
                             deployed_data = json.load(f)
@@ -287,37 +329,55 @@ class ServiceManager:
 _service_manager = ServiceManager()
 
 
+async def _probe_command(cmd: List[str], cwd: Optional[Path] = None, timeout: float = 10) -> bool:
+    """True if the command runs and exits with status 0 within the timeout."""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=cwd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+    except OSError:
+        return False
+    try:
+        return await asyncio.wait_for(process.wait(), timeout) == 0
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        return False
+
+
+@functools.lru_cache(maxsize=1)
 def check_service_requirements() -> Dict[str, bool]:
-    """Check which services are available for testing."""
-    requirements = {
-        'hardhat': False,
-        'ipfs': False,
-        'web3': False,
-        'snarkjs': False
-    }
+    """Check which services are available for testing.
     
-    try:
-        # Check Hardhat
-        result = subprocess.run(
-            ["npx", "hardhat", "--version"],
-            capture_output=True,
-            timeout=10,
-            cwd=project_root / "contracts"
+    The probes spawn subprocesses, so the result is cached for the session;
+    treat the returned dict as read-only.
+    """
+    async def probe_all():
+        return await asyncio.gather(
+            _probe_command(["npx", "hardhat", "--version"], cwd=CONTRACTS_DIR),
+            _probe_command(["ipfs", "version"]),
+            _probe_command(["snarkjs", "--version"])
         )
-        requirements['hardhat'] = result.returncode == 0
-    except:
-        pass
     
+    # The CLI probes are independent, so run them side by side
     try:
-        # Check IPFS
-        result = subprocess.run(
-            ["ipfs", "version"],
-            capture_output=True,
-            timeout=10
-        )
-        requirements['ipfs'] = result.returncode == 0
-    except:
-        pass
+        asyncio.get_running_loop()
+    except RuntimeError:
+        hardhat_ok, ipfs_ok, snarkjs_ok = asyncio.run(probe_all())
+    else:
+        # Called from inside an event loop (e.g. an async test), where
+        # asyncio.run is not allowed; give the probes their own loop on a worker
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            hardhat_ok, ipfs_ok, snarkjs_ok = executor.submit(asyncio.run, probe_all()).result()
+    requirements = {
+        'hardhat': hardhat_ok,
+        'ipfs': ipfs_ok,
+        'web3': False,
+        'snarkjs': snarkjs_ok
+    }
     
     try:
         # Check web3
@@ -326,47 +386,68 @@ def check_service_requirements() -> Dict[str, bool]:
     except ImportError:
         pass
     
-    try:
-        # Check snarkjs
-        result = subprocess.run(
-            ["snarkjs", "--version"],
-            capture_output=True,
-            timeout=10
-        )
-        requirements['snarkjs'] = result.returncode == 0
-    except:
-        pass
-    
     return requirements
 
 
-@contextmanager
-def integration_environment():
-    """Context manager for integration test environment."""
-    try:
-        # Start services
-        services_started = []
+def _start_services(available: Optional[Dict[str, bool]] = None) -> List[str]:
+    """Start Hardhat, deploy the contracts and start IPFS; return what came up.
+    
+    IPFS does not depend on the chain, so it boots on a worker thread while
+    Hardhat starts and the contracts deploy. The two sides only touch their
+    own ServiceManager attributes. When ``available`` comes from
+    check_service_requirements, tools it reports missing are not launched.
+    """
+    services_started = []
+    
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        ipfs_future = None
+        if available is None or available.get('ipfs'):
+            ipfs_future = executor.submit(_service_manager.start_ipfs_daemon)
         
-        if _service_manager.start_hardhat_node():
+        if (available is None or available.get('hardhat')) and _service_manager.start_hardhat_node():
             services_started.append('hardhat')
             if _service_manager.deploy_contracts():
                 services_started.append('contracts')
         
-        if _service_manager.start_ipfs_daemon():
+        if ipfs_future is not None and ipfs_future.result():
             services_started.append('ipfs')
+    
+    return services_started
+
+
+def _integration_env_vars() -> Dict[str, str]:
+    """Environment variables pointing the adapters at the running services."""
+    return {
+        'USE_REAL_EVM': '1',
+        'USE_REAL_IPFS': '1',
+        'WEB3_PROVIDER_URI': _service_manager.get_web3_uri() or '',
+        'IPFS_API_URL': _service_manager.get_ipfs_api_url() or ''
+    }
+
+
+def _evm_rpc(method: str, params: Optional[List[Any]] = None) -> Any:
+    """Send a single JSON-RPC call to the Hardhat node."""
+    payload = json.dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": params or []})
+    request = urllib.request.Request(
+        _service_manager.get_web3_uri(),
+        data=payload.encode(),
+        headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read())["result"]
+
+
+@contextmanager
+def integration_environment():
+    """Context manager for integration test environment."""
+    old_env = {}
+    try:
+        services_started = _start_services()
         
         # Set environment variables
-        old_env = {}
-        new_env = {
-            'USE_REAL_EVM': '1',
-            'USE_REAL_IPFS': '1',
-            'WEB3_PROVIDER_URI': _service_manager.get_web3_uri() or '',
-            'IPFS_API_URL': _service_manager.get_ipfs_api_url() or ''
-        }
-        
-        for key, value in new_env.items():
-            old_env[key] = os.environ.get(key)
-            os.environ[key] = value
+        new_env = _integration_env_vars()
+        old_env = {key: os.environ.get(key) for key in new_env}
+        os.environ.update(new_env)
         
         yield {
             'services_started': services_started,
@@ -378,16 +459,53 @@ def integration_environment():
         
     finally:
         # Restore environment
+        os.environ.update({key: value for key, value in old_env.items() if value is not None})
         for key, value in old_env.items():
             if value is None:
                 os.environ.pop(key, None)
-            else:
-                os.environ[key] = value
         
         # Cleanup services
         _service_manager.cleanup()
 
 
+@pytest.fixture(scope="session")
+def integration_services(request, service_requirements):
+    """Start Hardhat, the contracts and IPFS once for the whole session."""
+    request.addfinalizer(_service_manager.cleanup)
+    services_started = _start_services(service_requirements)
+    yield {
+        'services_started': services_started,
+        'hardhat_port': _service_manager.hardhat_port,
+        'ipfs_port': _service_manager.ipfs_port,
+        'deployment_addresses': _service_manager.deployment_addresses.copy(),
+        'service_manager': _service_manager
+    }
+
+
+@pytest.fixture(scope="session")
+def service_requirements() -> Dict[str, bool]:
+    """Which external services and tools are available in this session."""
+    return dict(check_service_requirements())
+
+
+@pytest.fixture
+def integration_env(integration_services, monkeypatch):
+    """Point the adapters at the session services for one test."""
+    for key, value in _integration_env_vars().items():
+        monkeypatch.setenv(key, value)
+    return integration_services
+
+
+@pytest.fixture
+def evm_snapshot(integration_services):
+    """Revert the Hardhat chain to its pre-test state after each test."""
+    if 'hardhat' not in integration_services['services_started']:
+        pytest.skip("Hardhat node not available")
+    snapshot_id = _evm_rpc("evm_snapshot")
+    yield snapshot_id
+    _evm_rpc("evm_revert", [snapshot_id])
+
+
 def pytest_configure(config):
     """Configure pytest for integration tests."""
     # Add custom markers
@@ -416,17 +534,23 @@ def check_snark_artifacts_available() -> bool:
 
 def pytest_collection_modifyitems(config, items):
     """Modify test collection to handle integration tests."""
-    skip_integration = pytest.mark.skip(reason="Integration tests require external services")
     skip_snark = pytest.mark.skip(reason="SNARK circuit artifacts not available (circuits/build/)")
     
     snark_available = check_snark_artifacts_available()
     
+    # Integration tests excluded with -m are dropped outright rather than reported as skipped
+    if "not integration" in (config.getoption("-m") or ""):
+        remaining, deselected = [], []
+        for item in items:
+            if item.get_closest_marker("integration") is not None:
+                deselected.append(item)
+            else:
+                remaining.append(item)
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = remaining
+    
     for item in items:
-        if "integration" in item.keywords:
-            # Check if I should skip integration tests
-            if config.getoption("-m") and "not integration" in config.getoption("-m"):
-                item.add_marker(skip_integration)
-        
         # Skip tests that require SNARK artifacts if they're not available
         if not snark_available:
             test_file = str(item.fspath)
@@ -248,6 +248,16 @@ class TestBackendSwitching(unittest.TestCase):
         backend.request_data_redaction_with_full_proofs.assert_called_once()
 
 
+    def test_fallback_nullifier_is_deterministic(self):
+        """Fallback nullifier depends only on patient and public signals."""
+        from medical.backends import _fallback_nullifier
+
+        first = _fallback_nullifier("patient", [1, 2, 3])
+        self.assertEqual(len(first), 32)
+        self.assertEqual(first, _fallback_nullifier("patient", ["1", "2", "3"]))
+        self.assertNotEqual(first, _fallback_nullifier("patient", [1, 2, 4]))
+        self.assertNotEqual(first, _fallback_nullifier("other", [1, 2, 3]))
+
 class TestHybridManager(unittest.TestCase):
     """Test HybridSNARKManager real-mode behavior."""
     
@@ -292,7 +302,32 @@ class TestHybridManager(unittest.TestCase):
         self.assertIsNotNone(proof)
         self.assertTrue(proof.proof_id.startswith("real_"))
         mock_client.prove_redaction.assert_called_once()
-    
+
+    def test_batch_proofs_keep_input_order(self):
+        """HybridSNARKManager batch proofs should come back in input order."""
+        try:
+            from medical.MedicalRedactionEngine import HybridSNARKManager
+        except ImportError:
+            self.skipTest("Medical redaction engine not available")
+
+        mock_client = MagicMock()
+        mock_client.is_available.return_value = True
+        mock_client.prove_redaction.return_value = {
+            "verified": True,
+            "calldata": {"pubSignals": [123]},
+            "proof": {"pi_a": ["1", "2", "1"], "pi_b": [["1", "0"], ["1", "0"]], "pi_c": ["1", "2"]}
+        }
+
+        manager = HybridSNARKManager(mock_client)
+        items = [
+            {"redaction_type": rt, "request_id": f"req_{rt}", "original_data": "data"}
+            for rt in ("DELETE", "MODIFY", "ANONYMIZE")
+        ]
+        proofs = manager.create_redaction_proofs_batch(items)
+        self.assertEqual([p.operation_type for p in proofs], ["DELETE", "MODIFY", "ANONYMIZE"])
+        self.assertEqual(mock_client.prove_redaction.call_count, 3)
+        self.assertEqual(manager.create_redaction_proofs_batch([]), [])
+
     def test_hybrid_snark_manager_verify_proof(self):
         """HybridSNARKManager.verify_redaction_proof should use the client verifier."""
         try:
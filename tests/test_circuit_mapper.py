@@ -159,6 +159,15 @@ class TestMedicalDataCircuitMapper:
         assert all(isinstance(x, int) for x in private["redactedData"])
         assert all(isinstance(x, int) for x in private["policyData"])
     
+    def test_merkle_root_0_matches_public_input(self):
+        """Test that merkle_root_0 mirrors the merkleRoot0 public input."""
+        inputs = self.mapper.prepare_circuit_inputs(
+            self.sample_record,
+            "DELETE"
+        )
+
+        assert inputs.merkle_root_0 == str(inputs.public_inputs["merkleRoot0"])
+
     def test_validate_circuit_inputs_valid(self):
         """Test validation passes for valid inputs."""
         inputs = self.mapper.prepare_circuit_inputs(
@@ -222,6 +231,21 @@ class TestMedicalDataCircuitMapper:
         assert inputs1.public_inputs == inputs2.public_inputs
         assert inputs1.private_inputs == inputs2.private_inputs
     
+    def test_batch_matches_single_record_mapping(self):
+        """Test that batch preparation matches per-record preparation."""
+        records = [self.sample_record, {"patient_id": "MIN_001"}, {}]
+        batch = self.mapper.prepare_circuit_inputs_batch(records, "MODIFY", "custom_policy")
+        
+        assert len(batch) == len(records)
+        for record, inputs in zip(records, batch):
+            single = self.mapper.prepare_circuit_inputs(record, "MODIFY", "custom_policy")
+            # Default nullifiers are time-based, so compare everything else
+            for key in ("nullifier0", "nullifier1"):
+                single.public_inputs.pop(key)
+                inputs.public_inputs.pop(key)
+            assert inputs.public_inputs == single.public_inputs
+            assert inputs.private_inputs == single.private_inputs
+    
     def test_custom_policy_hash(self):
         """Test using custom policy hash."""
         custom_policy = "custom_gdpr_policy_v1"
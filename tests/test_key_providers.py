@@ -4,6 +4,7 @@
 import os
 import sys
 import unittest
+import unittest.mock
 import tempfile
 import base64
 
@@ -23,8 +24,13 @@ class TestEnvKeyProvider(unittest.TestCase):
     def setUp(self):
         self.prev_key = os.environ.get("IPFS_ENC_KEY")
         self.prev_id = os.environ.get("IPFS_ENC_KEY_ID")
+        self.prev_pool = os.environ.get("IPFS_ENC_KEYS")
 
     def tearDown(self):
+        if self.prev_pool is None:
+            os.environ.pop("IPFS_ENC_KEYS", None)
+        else:
+            os.environ["IPFS_ENC_KEYS"] = self.prev_pool
         if self.prev_key is None:
             os.environ.pop("IPFS_ENC_KEY", None)
         else:
@@ -41,6 +47,27 @@ class TestEnvKeyProvider(unittest.TestCase):
         k, kid = prov.get_active_key()
         self.assertEqual(k, key)
         self.assertTrue(kid)
+        self.assertEqual(prov.get_active_key(), (k, kid))
+
+        # Changing the env var must not return the cached key
+        key2 = os.urandom(32)
+        os.environ["IPFS_ENC_KEY"] = base64.b64encode(key2).decode()
+        self.assertEqual(prov.get_active_key()[0], key2)
+
+    def test_env_provider_pool_tracks_env_changes(self):
+        os.environ.pop("IPFS_ENC_KEYS", None)
+        prov = EnvKeyProvider()
+        k1, kid1 = prov.rotate()
+        k2, kid2 = prov.rotate()
+        self.assertEqual(prov.resolve_key(kid1), k1)
+        self.assertEqual(prov.list_kids(), [kid2, kid1])
+
+        # External edits to the pool are picked up on the next lookup
+        os.environ["IPFS_ENC_KEYS"] = '{"bad": "AAAA", "%s": "%s"}' % (
+            kid2, base64.b64encode(k2).decode())
+        self.assertIsNone(prov.resolve_key(kid1))
+        self.assertIsNone(prov.resolve_key("bad"))
+        self.assertEqual(prov.list_kids(), [kid2, "bad"])
 
 
 @unittest.skipIf(AESGCM is None, "cryptography AESGCM not available")
@@ -89,3 +116,32 @@ class TestFileKeyProvider(unittest.TestCase):
         mgr2 = IPFSMedicalDataManager(ipfs, key_provider=prov)
         ds1_again = mgr2.download_dataset(h_old)
         self.assertIsNotNone(ds1_again)
+
+    def test_file_provider_reuses_derived_key(self):
+        from medical import key_provider
+
+        prov = FileKeyProvider(self.path, passphrase=self.passphrase)
+        k, kid = prov.rotate()
+        fresh = FileKeyProvider(self.path, passphrase=self.passphrase)
+        with unittest.mock.patch.object(key_provider, "Scrypt", wraps=key_provider.Scrypt) as scrypt:
+            self.assertEqual(fresh.get_active_key(), (k, kid))
+            self.assertEqual(fresh.resolve_key(kid), k)
+            self.assertEqual(fresh.get_active_key(), (k, kid))
+        scrypt.assert_not_called()
+
+        # A different passphrase must not hit the cached wrapping key
+        wrong = FileKeyProvider(self.path, passphrase="other-passphrase")
+        self.assertEqual(wrong.get_active_key(), (None, None))
+
+    def test_file_provider_unwrapped_cache_is_bounded(self):
+        from medical import key_provider
+
+        prov = FileKeyProvider(self.path, passphrase=self.passphrase)
+        kids = [prov.rotate()[1] for _ in range(3)]
+        with unittest.mock.patch.object(key_provider, "_UNWRAPPED_CACHE_SIZE", 2):
+            for kid in kids:
+                self.assertIsNotNone(prov.resolve_key(kid))
+            self.assertEqual(len(prov._unwrapped), 2)
+            # The oldest key is evicted but still resolves by unwrapping again
+            self.assertIsNotNone(prov.resolve_key(kids[0]))
+            self.assertEqual(len(prov._unwrapped), 2)
@@ -0,0 +1,205 @@
+"""
+Tests for the Enhanced Hybrid SNARK Manager
+===========================================
+
+Exercises proof creation against a mocked SnarkClient so no circuit
+artifacts or snarkjs installation are required.
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+from medical.my_snark_manager import EnhancedHybridSNARKManager, _sigs_tag
+
+
+class TestEnhancedHybridSNARKManager:
+    """Test suite for EnhancedHybridSNARKManager with a mocked client."""
+
+    def setup_method(self):
+        """Set up a manager around a mocked snark client."""
+        self.client = MagicMock()
+        self.client.is_available.return_value = True
+        self.client.prove_redaction.return_value = {
+            "verified": True,
+            "calldata": {"pubSignals": [str(i) for i in range(16)]},
+            "proof": {"pi_a": ["1", "2", "1"], "pi_b": [["1", "0"], ["1", "0"]], "pi_c": ["1", "2"]}
+        }
+        self.manager = EnhancedHybridSNARKManager(self.client)
+        self.request = {
+            "request_id": "req_001",
+            "redaction_type": "ANONYMIZE",
+            "original_data": json.dumps({
+                "patient_id": "PAT_001",
+                "diagnosis": "Sensitive diagnosis",
+                "treatment": "Sensitive treatment",
+                "physician": "Dr. Test"
+            }),
+            "requester": "admin",
+            "policy_hash": "policy_anonymize"
+        }
+
+    def test_repeated_request_is_proved_again(self):
+        """Test that each request is proved so it binds its own nullifier."""
+        with patch("medical.my_snark_manager.time.time_ns", return_value=1_700_000_000 * 10**9):
+            self.manager.create_redaction_proof_with_consistency(self.request)
+        with patch("medical.my_snark_manager.time.time_ns", return_value=1_700_000_001 * 10**9):
+            self.manager.create_redaction_proof_with_consistency(self.request)
+        first = self.manager.create_redaction_proof(self.request)
+        second = self.manager.create_redaction_proof(self.request)
+
+        assert first is not None and second is not None
+        assert self.client.prove_redaction.call_count == 4
+        nullifiers = {call.args[0]["nullifier0"] for call in self.client.prove_redaction.call_args_list[:2]}
+        assert len(nullifiers) == 2
+
+    def test_batch_preserves_request_order(self):
+        """Test that pipelined batch proving returns proofs in input order."""
+        items = [dict(self.request, redaction_type=rt) for rt in ("DELETE", "MODIFY", "ANONYMIZE")]
+        proofs = self.manager.create_redaction_proofs_batch(items)
+
+        assert [p.operation_type for p in proofs] == ["DELETE", "MODIFY", "ANONYMIZE"]
+        assert self.client.prove_redaction.call_count == 3
+
+    def test_proof_id_tag_is_stable(self):
+        """Test that the proof id tag depends only on the public signals."""
+        proof = self.manager.create_redaction_proof(self.request)
+        tag = proof.proof_id.rsplit("_", 1)[-1]
+
+        assert proof.proof_id.startswith("real_groth16_")
+        assert len(tag) == 16
+        assert tag == _sigs_tag([str(i) for i in range(16)])
+
+    def test_extract_accepts_record_dict(self):
+        """Test that an in-process record dict is used without parsing."""
+        record = json.loads(self.request["original_data"])
+        extracted = self.manager._extract_medical_record_dict(dict(self.request, original_data=record))
+
+        assert extracted is record
+
+    def test_extract_record_dict_without_patient_id(self):
+        """Test that a record dict missing patient_id takes the request id."""
+        record = {"diagnosis": "Flu", "treatment": "Rest", "physician": "Dr. Test"}
+        extracted = self.manager._extract_medical_record_dict(dict(self.request, original_data=record))
+
+        assert extracted == dict(record, patient_id="req_001")
+        assert "patient_id" not in record
+
+    def test_extract_keeps_large_integer_fields(self):
+        """Test that integers wider than 64 bits survive record parsing."""
+        big = 2 ** 128 + 1
+        original = json.dumps({"patient_id": "PAT_001", "record_number": big})
+        extracted = self.manager._extract_medical_record_dict(dict(self.request, original_data=original))
+
+        assert extracted["record_number"] == big
+
+    def test_extract_falls_back_for_free_text(self):
+        """Test that non-JSON original data becomes a minimal record."""
+        extracted = self.manager._extract_medical_record_dict(dict(self.request, original_data="Flu"))
+
+        assert extracted == {
+            "patient_id": "req_001",
+            "diagnosis": "Flu",
+            "treatment": "",
+            "physician": "admin"
+        }
+
+    def test_consistency_proof_uses_nullifier_from_signals(self):
+        """Test that the consistency path reads its nullifier from the public signals."""
+        proof = self.manager.create_redaction_proof_with_consistency(self.request)
+
+        assert proof.proof_id.startswith("real_groth16_consistency_")
+        assert proof.nullifier == hex(8 + (9 << 128))[2:].zfill(64)
+
+    def test_metadata_reconstructs_named_hashes(self):
+        """Test that proof metadata rebuilds every hash from its limbs."""
+        proof = self.manager.create_redaction_proof_with_consistency(self.request)
+        hashes = self.manager.get_proof_metadata(proof)["reconstructed_hashes"]
+
+        assert hashes["policyHash"] == f"{0 + (1 << 128):064x}"
+        assert hashes["postStateHash"] == f"{12 + (13 << 128):064x}"
+        assert hashes["nullifier"] == proof.nullifier
+
+    def test_metadata_skips_malformed_signals(self):
+        """Test that signals which are not limbs leave out the rebuilt hashes."""
+        proof = self.manager.create_redaction_proof(self.request)
+        proof.prover_response = json.dumps(["x"] * 16)
+        metadata = self.manager.get_proof_metadata(proof)
+
+        assert metadata["proof_id"] == proof.proof_id
+        assert "reconstructed_hashes" not in metadata
+
+        proof.prover_response = json.dumps({"policyHash0": "1"})
+        assert "reconstructed_hashes" not in self.manager.get_proof_metadata(proof)
+
+    def test_repeated_verification_reuses_result(self):
+        """Test that a proof that verified once is not sent to snarkjs again."""
+        self.client.verify_proof.return_value = True
+        proof = self.manager.create_redaction_proof(self.request)
+
+        assert self.manager.verify_redaction_proof(proof, {})
+        assert self.manager.verify_redaction_proof(proof, {})
+        assert self.client.verify_proof.call_count == 1
+
+    def test_failed_verification_is_not_cached(self):
+        """Test that a failed verification is retried on the next call."""
+        self.client.verify_proof.return_value = False
+        proof = self.manager.create_redaction_proof(self.request)
+
+        assert not self.manager.verify_redaction_proof(proof, {})
+        assert not self.manager.verify_redaction_proof(proof, {})
+        assert self.client.verify_proof.call_count == 2
+
+    def test_verify_many_proofs_keeps_order(self):
+        """Test that batch verification reports results in input order."""
+        proof = self.manager.create_redaction_proof(self.request)
+        other = self.manager.create_redaction_proof(dict(self.request, policy_hash="policy_other"))
+        other.prover_response = "[]"
+        self.client.verify_proof.side_effect = lambda payload, signals: bool(signals)
+
+        assert self.manager.verify_redaction_proofs([proof, other, proof]) == [True, False, True]
+        assert self.manager.verify_redaction_proofs([]) == []
+
+    def test_trusted_mapper_skips_validation(self):
+        """Test that trust_mapper bypasses Python-side input validation."""
+        manager = EnhancedHybridSNARKManager(self.client, trust_mapper=True)
+        manager.circuit_mapper.validate_circuit_inputs = MagicMock(return_value=False)
+
+        assert manager.create_redaction_proof(self.request) is not None
+        manager.circuit_mapper.validate_circuit_inputs.assert_not_called()
+        assert self.manager.trust_mapper is False
+
+    def test_mode_info_is_not_shared(self):
+        """Test that callers cannot alter the mode info of later calls."""
+        info = self.manager.get_mode_info()
+        info["mode"] = "CHANGED"
+
+        assert self.manager.get_mode_info()["mode"] == "REAL"
+
+    def test_raw_proof_json_is_stored_verbatim(self):
+        """Test that snarkjs proof text is stored without re-serialization."""
+        raw = '{\n "pi_a": ["1", "2", "1"]\n}'
+        self.client.prove_redaction.return_value = dict(
+            self.client.prove_redaction.return_value, proof_raw=raw
+        )
+        proof = self.manager.create_redaction_proof(self.request)
+
+        assert proof.verifier_challenge == raw
+
+    def test_batch_with_one_worker_per_cpu(self):
+        """Test that the batch can fan out to one worker per CPU."""
+        items = [dict(self.request, request_id=f"req_{i}", policy_hash=f"policy_{i}") for i in range(6)]
+        proofs = self.manager.create_redaction_proofs_batch(items, max_workers=None)
+
+        assert all(p is not None for p in proofs)
+        assert self.client.prove_redaction.call_count == 6
+
+    def test_default_policy_follows_redaction_type(self):
+        """Test that a missing policy hash defaults to policy_<type>."""
+        request = {k: v for k, v in self.request.items() if k != "policy_hash"}
+        self.manager.create_redaction_proof(request)
+        expected = self.manager.circuit_mapper.prepare_circuit_inputs(
+            json.loads(self.request["original_data"]), "ANONYMIZE", "policy_ANONYMIZE"
+        )
+
+        public_inputs, _ = self.client.prove_redaction.call_args[0]
+        assert public_inputs["policyHash0"] == expected.public_inputs["policyHash0"]
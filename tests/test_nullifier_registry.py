@@ -9,14 +9,16 @@ Tests nullifier tracking, replay prevention, and batch operations.
 
 import pytest
 import hashlib
-import os
 from pathlib import Path
 
 # Skip if web3 not available
 pytest.importorskip("web3")
 
+from adapters.config import env_bool
+
+# Other test modules default USE_REAL_EVM to "0", so check the value, not presence
 pytestmark = pytest.mark.skipif(
-    not os.getenv("USE_REAL_EVM"),
+    not env_bool("USE_REAL_EVM"),
     reason="Nullifier registry tests require USE_REAL_EVM=1"
 )
 
@@ -26,31 +28,28 @@ class TestNullifierRegistry:
     """Tests for NullifierRegistry smart contract."""
     
     @pytest.fixture(autouse=True)
-    def setup(self):
-        """Deploy NullifierRegistry for testing."""
-        os.environ["USE_REAL_EVM"] = "1"
+    def setup(self, integration_env, evm_snapshot):
+        """Deploy NullifierRegistry on the session Hardhat node.
         
+        evm_snapshot is taken before the deployment, so each test starts
+        from the same chain state without restarting the node.
+        """
         from adapters.evm import EVMClient
         
         self.evm_client = EVMClient()
-        try:
-            if not self.evm_client.connect():
-                pytest.skip("Real EVM backend unavailable; skipping nullifier registry tests")
-            
-            # Deploy NullifierRegistry
-            deployed = self.evm_client.deploy("NullifierRegistry")
-            if not deployed:
-                pytest.skip("Failed to deploy NullifierRegistry – ensure Hardhat node is running")
-            addr, contract = deployed
-            
-            self.contract = contract
-            self.address = addr
-            
-            print(f"\n NullifierRegistry deployed at {addr}")
-            
-            yield
-        finally:
-            os.environ.pop("USE_REAL_EVM", None)
+        if not self.evm_client.connect():
+            pytest.skip("Real EVM backend unavailable; skipping nullifier registry tests")
+        
+        # Deploy NullifierRegistry
+        deployed = self.evm_client.deploy("NullifierRegistry")
+        if not deployed:
+            pytest.skip("Failed to deploy NullifierRegistry – ensure Hardhat node is running")
+        addr, contract = deployed
+        
+        self.contract = contract
+        self.address = addr
+        
+        print(f"\n NullifierRegistry deployed at {addr}")
     
     def test_initial_nullifier_validity(self):
         """Test that new nullifiers are initially valid."""
@@ -46,6 +46,53 @@ class TestSnarkClientDetailed(unittest.TestCase):
                 client = self.SnarkClient()
                 self.assertEqual(client.circuits_dir, custom_dir)
     
+    def test_warmup_prefetches_once(self):
+        """Test that warmup touches each proving artifact only once."""
+        with tempfile.TemporaryDirectory() as tmp:
+            custom_build = Path(tmp) / "build"
+            (custom_build / "redaction_js").mkdir(parents=True, exist_ok=True)
+            (custom_build / "redaction_js" / "redaction.wasm").write_bytes(b"\0asm")
+            (custom_build / "redaction_final.zkey").write_bytes(b"zkey")
+            (custom_build / "verification_key.json").write_text("{}")
+            with patch.dict(os.environ, {"CIRCUITS_DIR": tmp}):
+                client = self.SnarkClient()
+            with patch("builtins.open", wraps=open) as mock_file:
+                client.warmup()
+                client.warmup()
+            self.assertEqual(mock_file.call_count, 3)
+
+    def test_prove_uses_per_call_outputs(self):
+        """Test that each prove writes its own outputs and publishes the latest pair."""
+        with tempfile.TemporaryDirectory() as tmp:
+            custom_build = Path(tmp) / "build"
+            (custom_build / "redaction_js").mkdir(parents=True, exist_ok=True)
+            (custom_build / "redaction_js" / "redaction.wasm").touch()
+            (custom_build / "redaction_final.zkey").touch()
+            (custom_build / "verification_key.json").touch()
+            witness = custom_build / "witness.wtns"
+            witness.touch()
+            with patch.dict(os.environ, {"CIRCUITS_DIR": tmp}):
+                client = self.SnarkClient()
+            
+            outputs = []
+            def fake_prove(args, cwd=None):
+                proof_out, public_out = Path(args[-2]), Path(args[-1])
+                outputs.append(proof_out.name)
+                proof_out.write_text(json.dumps({"n": len(outputs)}))
+                public_out.write_text(json.dumps([str(len(outputs))]))
+            
+            with patch.object(client, "_run_snarkjs", side_effect=fake_prove):
+                first = client.prove(witness)
+                second = client.prove(witness)
+            
+            self.assertEqual(first, ({"n": 1}, ["1"]))
+            self.assertEqual(second, ({"n": 2}, ["2"]))
+            self.assertEqual(len(set(outputs)), 2)
+            self.assertNotIn("proof.json", outputs)
+            self.assertEqual(json.loads((custom_build / "public.json").read_text()), ["2"])
+            leftovers = sorted(p.name for p in custom_build.glob("p*_*.json"))
+            self.assertEqual(leftovers, [])
+    
     def test_availability_checks(self):
         """Test circuit artifact availability checks."""
         client = self.SnarkClient()